@@ -0,0 +1,260 @@
+"""Batch evaluation of startups from CSV/JSONL exports
+
+Usage:
+    python batch.py startups.csv -o results.jsonl --concurrency 4
+
+Each input row holds the ``StartupInfo`` fields (name, industry, pitch,
+founded_year, funding) plus ``questions`` and ``answers``. In CSV files the
+lists are JSON arrays or ``||``-separated strings. Rows with answers are
+evaluated; rows without answers get questions generated. Results are
+appended to a JSONL file as rows finish, and re-running with the same output
+skips rows that already completed.
+"""
+import argparse
+import asyncio
+import csv
+import importlib.util
+import json
+import logging
+import os
+import time
+from typing import Awaitable, Callable, List, Optional, Set
+
+from inference_executor import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_ATTEMPTS = 5
+
+STARTUP_FIELDS = ["name", "industry", "pitch", "founded_year", "funding"]
+LIST_SEPARATOR = "||"
+
+RowProcessor = Callable[[dict], Awaitable[dict]]
+
+
+def _parse_list(value) -> List[str]:
+    if value is None or value == "":
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    value = str(value).strip()
+    if value.startswith("["):
+        return [str(item) for item in json.loads(value)]
+    return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+
+
+def normalize_row(raw: dict) -> dict:
+    """Convert a flat CSV/JSONL row or a nested request-shaped row to one format"""
+    startup = raw.get("startup") or {field: raw.get(field, "") for field in STARTUP_FIELDS}
+    enhance = raw.get("enhance_with_groq", True)
+    if isinstance(enhance, str):
+        enhance = enhance.strip().lower() not in ("0", "false", "no", "")
+    return {
+        "id": str(raw.get("id", "")) or None,
+        "startup": {field: str(startup.get(field, "")).strip() for field in STARTUP_FIELDS},
+        "questions": _parse_list(raw.get("questions")),
+        "answers": _parse_list(raw.get("answers")),
+        "enhance_with_groq": bool(enhance),
+    }
+
+
+def load_rows(path: str) -> List[dict]:
+    """Read and normalize every row of a .csv or .jsonl file"""
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            raw_rows = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            raw_rows = [json.loads(line) for line in f if line.strip()]
+    return [normalize_row(raw) for raw in raw_rows]
+
+
+def completed_rows(journal_path: str) -> Set[int]:
+    """Row indexes that already finished successfully in a previous run"""
+    done = set()
+    if not os.path.exists(journal_path):
+        return done
+    with open(journal_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partially written line from an interrupted run
+            if record.get("status") == "ok":
+                done.add(record["row"])
+    return done
+
+
+def journal_path_for(output_path: str) -> str:
+    """JSONL file that rows are appended to (Parquet output is built from it at the end)"""
+    if output_path.endswith(".parquet"):
+        return output_path[: -len(".parquet")] + ".jsonl"
+    return output_path
+
+
+def check_parquet_support():
+    """Raise before any row runs if results cannot be written as Parquet"""
+    if importlib.util.find_spec("pandas") is None:
+        raise RuntimeError("Parquet output needs pandas and pyarrow installed")
+    if not any(importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")):
+        raise RuntimeError("Parquet output needs pyarrow (or fastparquet) installed")
+
+
+def write_parquet(journal_path: str, output_path: str):
+    """Convert the JSONL journal into a Parquet file with one row per startup"""
+    import pandas as pd
+
+    latest = {}
+    with open(journal_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                latest[record["row"]] = record
+    records = [
+        {**{key: value for key, value in record.items() if key != "result"},
+         "result": json.dumps(record.get("result"), ensure_ascii=False)}
+        for _, record in sorted(latest.items())
+    ]
+    pd.DataFrame(records).to_parquet(output_path, index=False)
+
+
+class BatchRun:
+    """Fans rows out to ``process_row`` with bounded parallelism
+
+    Results are appended to the journal as each row finishes, so an
+    interrupted run can be resumed by starting again with the same output.
+    """
+
+    def __init__(self, rows: List[dict], output_path: str, process_row: RowProcessor,
+                 concurrency: int = BATCH_CONCURRENCY):
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        self.rows = rows
+        self.output_path = output_path
+        self.journal_path = journal_path_for(output_path)
+        if self.output_path != self.journal_path:
+            check_parquet_support()
+        self.process_row = process_row
+        self.concurrency = concurrency
+        self.status = "pending"
+        self.total = len(rows)
+        self.skipped = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._write_lock = asyncio.Lock()
+
+    async def _process_with_retry(self, row: dict) -> dict:
+        for attempt in range(BATCH_MAX_ATTEMPTS):
+            try:
+                return await self.process_row(row)
+            except QueueFullError:
+                # Model queue saturated; back off instead of failing the row
+                if attempt == BATCH_MAX_ATTEMPTS - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def _run_row(self, index: int, row: dict, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            record = {"row": index, "id": row["id"], "startup": row["startup"]["name"]}
+            try:
+                record.update(status="ok", result=await self._process_with_retry(row))
+                self.succeeded += 1
+            except Exception as e:
+                logger.warning(f"Batch row {index} failed: {str(e)}")
+                record.update(status="error", error=str(e))
+                self.failed += 1
+
+            async with self._write_lock:
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    async def run(self):
+        self.status = "running"
+        self.started_at = time.time()
+        os.makedirs(os.path.dirname(os.path.abspath(self.journal_path)), exist_ok=True)
+
+        done = completed_rows(self.journal_path)
+        self.skipped = len(done)
+        if done:
+            logger.info(f"Resuming batch: {len(done)} of {self.total} rows already completed")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(*(
+            self._run_row(index, row, semaphore)
+            for index, row in enumerate(self.rows)
+            if index not in done
+        ))
+
+        if self.output_path != self.journal_path:
+            write_parquet(self.journal_path, self.output_path)
+
+        self.finished_at = time.time()
+        self.status = "completed"
+        logger.info(f"Batch finished: {self.succeeded} ok, {self.failed} failed, {self.skipped} skipped")
+
+    def progress(self) -> dict:
+        finished = self.skipped + self.succeeded + self.failed
+        return {
+            "status": self.status,
+            "total": self.total,
+            "finished": finished,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "progress": round(finished / self.total, 3) if self.total else 1.0,
+            "output_path": self.output_path,
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 1) if self.started_at else 0.0,
+        }
+
+
+async def _run_cli(args):
+    # Imported here so the module can be used by main.py without a circular import
+    from main import process_batch_row
+    from inference_executor import shutdown_executors
+    from my_groq import close_groq_client
+
+    rows = load_rows(args.input)
+    if args.no_groq:
+        for row in rows:
+            row["enhance_with_groq"] = False
+
+    batch = BatchRun(rows, args.output, process_batch_row, concurrency=args.concurrency)
+    try:
+        await batch.run()
+    finally:
+        shutdown_executors()
+        await close_groq_client()
+    print(json.dumps(batch.progress(), indent=2))
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate startups in bulk from a CSV or JSONL file")
+    parser.add_argument("input", help="CSV or JSONL file of startups with questions and answers")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="Output .jsonl or .parquet file")
+    parser.add_argument("-c", "--concurrency", type=_positive_int, default=BATCH_CONCURRENCY, help="Rows processed in parallel")
+    parser.add_argument("--no-groq", action="store_true", help="Skip Groq enhancement of evaluations")
+    args = parser.parse_args()
+    if args.output.endswith(".parquet"):
+        try:
+            check_parquet_support()
+        except RuntimeError as e:
+            parser.error(str(e))
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(_run_cli(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from inference_executor import get_model_executor
+from model_loading import generate_for_adapter
+from prompt import Prompt
+
+logger = logging.getLogger(__name__)
+
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", "25"))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "4"))
+
+# (adapter_name, max_new_tokens, temperature)
+BatchKey = Tuple[str, int, float]
+BatchRunner = Callable[[BatchKey, List[Prompt]], Awaitable[List[str]]]
+
+
+class BatchScheduler:
+    """Micro-batching scheduler for local generation
+
+    Prompts submitted for the same adapter and generation parameters within
+    ``window_ms`` of each other are sent to the model as one padded batch.
+    Each caller gets back only its own decoded output.
+    """
+
+    def __init__(self, runner: BatchRunner, window_ms: float = BATCH_WINDOW_MS,
+                 max_batch_size: int = MAX_BATCH_SIZE):
+        self._runner = runner
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[BatchKey, List[Tuple[Prompt, asyncio.Future]]] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        # The event loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+        self._batches_run = 0
+        self._prompts_run = 0
+
+    async def submit(self, prompt: Prompt, adapter_name: str, max_new_tokens: int = 1024,
+                     temperature: float = 0.7) -> str:
+        """Queue a prompt for the next batch and wait for its response"""
+        loop = asyncio.get_running_loop()
+        key = (adapter_name, max_new_tokens, temperature)
+        future = loop.create_future()
+
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        batch.append((prompt, future))
+
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+
+        return await future
+
+    def _flush(self, key: BatchKey):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            task = asyncio.ensure_future(self._run(key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: BatchKey, batch: List[Tuple[Prompt, asyncio.Future]]):
+        prompts = [prompt for prompt, _ in batch]
+        logger.info(f"Running batch of {len(prompts)} prompt(s) for adapter '{key[0]}'")
+        try:
+            outputs = await self._runner(key, prompts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._batches_run += 1
+        self._prompts_run += len(prompts)
+        for (_, future), output in zip(batch, outputs):
+            if not future.done():
+                future.set_result(output)
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "pending_prompts": sum(len(batch) for batch in self._pending.values()),
+            "batches_run": self._batches_run,
+            "prompts_run": self._prompts_run,
+            "avg_batch_size": round(self._prompts_run / self._batches_run, 2) if self._batches_run else 0.0,
+        }
+
+
+async def _run_on_model_executor(key: BatchKey, prompts: List[Prompt]) -> List[str]:
+    adapter_name, max_new_tokens, temperature = key
+    return await get_model_executor().run(
+        generate_for_adapter, adapter_name, prompts, max_new_tokens, temperature
+    )
+
+# Singleton scheduler
+_batch_scheduler = None
+
+def get_batch_scheduler() -> BatchScheduler:
+    """Get singleton batch scheduler backed by the model executor"""
+    global _batch_scheduler
+    if _batch_scheduler is None:
+        _batch_scheduler = BatchScheduler(_run_on_model_executor)
+    return _batch_scheduler
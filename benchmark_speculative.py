@@ -0,0 +1,79 @@
+"""Benchmark speculative decoding modes against normal generation
+
+Usage:
+    python benchmark_speculative.py --adapter eval --runs 3 --max-new-tokens 1024
+
+Runs the same prompt with every mode on the local HF model and prints the
+mean latency and decoded tokens per second of each.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import torch
+
+from model_loading import (
+    ADAPTERS,
+    EVAL_ADAPTER_NAME,
+    QUESTION_ADAPTER_NAME,
+    SAMPLE_ANSWERS,
+    SAMPLE_QUESTIONS,
+    SAMPLE_STARTUP,
+    SPECULATIVE_MODES_AVAILABLE,
+    generate_batch,
+    get_tokenizer,
+    load_adapter,
+)
+from prompt import evaluation_prompt_segments, question_prompt_segments
+
+
+def benchmark_mode(adapter_name: str, mode: str, runs: int, max_new_tokens: int, temperature: float) -> dict:
+    model = load_adapter(adapter_name)
+    tokenizer = get_tokenizer()
+    if adapter_name == QUESTION_ADAPTER_NAME:
+        prompt = question_prompt_segments(SAMPLE_STARTUP)
+    else:
+        prompt = evaluation_prompt_segments(SAMPLE_STARTUP, SAMPLE_QUESTIONS, SAMPLE_ANSWERS)
+
+    # Warm-up run so model loading and kernel compilation aren't measured
+    generate_batch(model, [prompt], 16, temperature, adapter_name, speculative=mode)
+
+    latencies, token_counts = [], []
+    for run in range(runs):
+        torch.manual_seed(run)
+        start = time.perf_counter()
+        response = generate_batch(model, [prompt], max_new_tokens, temperature, adapter_name, speculative=mode)[0]
+        latencies.append(time.perf_counter() - start)
+        token_counts.append(len(tokenizer(response, add_special_tokens=False).input_ids))
+
+    return {
+        "mode": mode,
+        "mean_seconds": round(statistics.mean(latencies), 2),
+        "mean_tokens": round(statistics.mean(token_counts)),
+        "tokens_per_second": round(sum(token_counts) / sum(latencies), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare speculative decoding modes")
+    parser.add_argument("--adapter", default=EVAL_ADAPTER_NAME, choices=list(ADAPTERS))
+    parser.add_argument("--modes", nargs="+", default=list(SPECULATIVE_MODES_AVAILABLE), choices=SPECULATIVE_MODES_AVAILABLE)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-new-tokens", type=int, default=1024)
+    parser.add_argument("--temperature", type=float, default=0.6)
+    args = parser.parse_args()
+
+    results = [
+        benchmark_mode(args.adapter, mode, args.runs, args.max_new_tokens, args.temperature)
+        for mode in args.modes
+    ]
+    baseline = next((result for result in results if result["mode"] == "off"), None)
+    for result in results:
+        if baseline is not None:
+            result["speedup"] = round(baseline["mean_seconds"] / result["mean_seconds"], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
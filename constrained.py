@@ -0,0 +1,156 @@
+"""Grammar-constrained decoding for the numbered question list
+
+The question adapter is forced to write exactly
+
+    1. <question>?
+    2. <question>?
+    ...
+    10. <question>?<eos>
+
+so every generation parses into ``count`` questions and decoding ends as soon
+as the last question mark is written. ``NumberedQuestionsLogitsProcessor``
+enforces this for transformers; the same format is exported as a regex (vLLM
+``guided_regex``) and a GBNF grammar (llama.cpp) for the server backends.
+"""
+import threading
+from typing import Dict, List
+
+import torch
+from transformers import LogitsProcessor
+
+QUESTION_COUNT = 10
+MIN_QUESTION_CHARS = 10   # Before the "?"; parse_questions_from_response drops shorter questions
+MAX_QUESTION_TOKENS = 80  # A "?" is forced after this many tokens, bounding the whole list
+
+# Phases of the per-sequence state machine
+_NUMBER, _FIRST_WORD, _BODY, _NEWLINE, _DONE = range(5)
+
+
+class VocabularyClasses:
+    """Token ids grouped by what their text contains, computed once per tokenizer"""
+
+    def __init__(self, tokenizer):
+        self.texts = tokenizer.batch_decode([[token_id] for token_id in range(len(tokenizer))])
+        special = set(tokenizer.all_special_ids)
+        self.newline = [i for i, text in enumerate(self.texts) if "\n" in text or i in special]
+        self.question_mark = [i for i, text in enumerate(self.texts) if "?" in text]
+        self.word_start = [
+            i for i, text in enumerate(self.texts)
+            if len(text) > 1 and text[0] == " " and text[1].isalnum() and i not in special
+        ]
+        self.newline_id = tokenizer.encode("\n", add_special_tokens=False)[-1]
+        self.question_mark_id = tokenizer.encode("?", add_special_tokens=False)[-1]
+        self.number_ids = [tokenizer.encode(f"{n}.", add_special_tokens=False) for n in range(1, QUESTION_COUNT + 1)]
+
+
+_vocabularies: Dict[int, VocabularyClasses] = {}
+_vocabulary_lock = threading.Lock()
+
+def get_vocabulary_classes(tokenizer) -> VocabularyClasses:
+    """Decoding the vocabulary takes about a second, so it is done once per tokenizer"""
+    with _vocabulary_lock:
+        if id(tokenizer) not in _vocabularies:
+            _vocabularies[id(tokenizer)] = VocabularyClasses(tokenizer)
+        return _vocabularies[id(tokenizer)]
+
+
+class _SequenceState:
+    def __init__(self):
+        self.item = 0       # Questions completed
+        self.phase = _NUMBER
+        self.position = 0   # Tokens of the current "N." prefix already written
+        self.tokens = 0     # Tokens in the current question
+        self.chars = 0      # Characters in the current question
+
+
+class NumberedQuestionsLogitsProcessor(LogitsProcessor):
+    """Masks logits so each sequence can only continue the numbered question list
+
+    Sequence state is advanced incrementally from the tokens generated since
+    the previous call, and rebuilt from the prompt end if a sequence got shorter.
+    """
+
+    def __init__(self, tokenizer, prompt_length: int, count: int = QUESTION_COUNT,
+                 max_question_tokens: int = MAX_QUESTION_TOKENS):
+        if count > QUESTION_COUNT:
+            raise ValueError(f"At most {QUESTION_COUNT} questions can be constrained")
+        self.vocabulary = get_vocabulary_classes(tokenizer)
+        self.prompt_length = prompt_length
+        self.count = count
+        self.max_question_tokens = max_question_tokens
+        self.eos_token_id = tokenizer.eos_token_id
+        self._states: List[_SequenceState] = []
+        self._consumed = 0
+        self._ids: Dict[str, torch.Tensor] = {}
+
+    def _advance(self, state: _SequenceState, token_id: int):
+        vocabulary = self.vocabulary
+        if state.phase == _NUMBER:
+            state.position += 1
+            if state.position == len(vocabulary.number_ids[state.item]):
+                state.phase = _FIRST_WORD
+        elif state.phase in (_FIRST_WORD, _BODY):
+            text = vocabulary.texts[token_id] if token_id < len(vocabulary.texts) else ""
+            state.phase = _BODY
+            state.tokens += 1
+            state.chars += len(text)
+            # The leading space is not part of the question
+            if text.rstrip().endswith("?") and state.chars - 1 > MIN_QUESTION_CHARS:
+                state.item += 1
+                state.phase = _DONE if state.item == self.count else _NEWLINE
+        elif state.phase == _NEWLINE:
+            state.phase, state.position, state.tokens, state.chars = _NUMBER, 0, 0, 0
+
+    def _tensor(self, name: str, ids: List[int], device) -> torch.Tensor:
+        if name not in self._ids:
+            self._ids[name] = torch.tensor(ids, dtype=torch.long, device=device)
+        return self._ids[name]
+
+    def _allow_only(self, row: torch.Tensor, token_id: int):
+        value = row[token_id].clone()
+        row.fill_(float("-inf"))
+        row[token_id] = value
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        generated = input_ids.shape[1] - self.prompt_length
+        if generated < self._consumed or len(self._states) != input_ids.shape[0]:
+            self._states = [_SequenceState() for _ in range(input_ids.shape[0])]
+            self._consumed = 0
+        new_tokens = input_ids[:, self.prompt_length + self._consumed:].tolist()
+        self._consumed = generated
+
+        vocabulary = self.vocabulary
+        for row, (state, tokens) in enumerate(zip(self._states, new_tokens)):
+            for token_id in tokens:
+                self._advance(state, token_id)
+
+            if state.phase == _NUMBER:
+                self._allow_only(scores[row], vocabulary.number_ids[state.item][state.position])
+            elif state.phase == _NEWLINE:
+                self._allow_only(scores[row], vocabulary.newline_id)
+            elif state.phase == _DONE:
+                self._allow_only(scores[row], self.eos_token_id)
+            elif state.phase == _FIRST_WORD:
+                allowed = self._tensor("word_start", vocabulary.word_start, scores.device)
+                mask = torch.full_like(scores[row], float("-inf"))
+                mask[allowed] = 0
+                scores[row] += mask
+            elif state.tokens >= self.max_question_tokens:
+                self._allow_only(scores[row], vocabulary.question_mark_id)
+            else:
+                scores[row, self._tensor("newline", vocabulary.newline, scores.device)] = float("-inf")
+                if state.chars - 1 < MIN_QUESTION_CHARS:
+                    scores[row, self._tensor("question_mark", vocabulary.question_mark, scores.device)] = float("-inf")
+        return scores
+
+
+def numbered_questions_regex(count: int = QUESTION_COUNT, max_chars: int = 400) -> str:
+    """The same format as a regular expression (vLLM ``guided_regex``)"""
+    question = f"[^\\n?]{{{MIN_QUESTION_CHARS},{max_chars}}}\\?"
+    return "\\n".join(f"{n}\\. {question}" for n in range(1, count + 1))
+
+
+def numbered_questions_gbnf(count: int = QUESTION_COUNT) -> str:
+    """The same format as a GBNF grammar (llama.cpp)"""
+    items = ' "\\n" '.join(f'"{n}. " question' for n in range(1, count + 1))
+    return f'root ::= {items}\nquestion ::= [^\\n?]+ "?"\n'
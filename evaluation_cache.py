@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+EVAL_CACHE_MAX_ENTRIES = int(os.getenv("EVAL_CACHE_MAX_ENTRIES", "512"))
+EVAL_CACHE_TTL_SECONDS = float(os.getenv("EVAL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))  # 0 disables expiry
+EVAL_CACHE_PATH = os.getenv("EVAL_CACHE_PATH", "")  # SQLite file; empty keeps the cache in memory only
+
+
+def make_cache_key(startup: dict, questions: List[str], answers: List[str], adapter: str,
+                   generation_params: dict) -> str:
+    """Build a stable content digest for an evaluation request
+
+    Unlike ``hash()``, the digest is identical across processes and restarts.
+    """
+    payload = json.dumps(
+        {
+            "startup": startup,
+            "questions": questions,
+            "answers": answers,
+            "adapter": adapter,
+            "generation": generation_params,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """LRU + TTL cache of finished evaluations with an optional SQLite backend
+
+    The in-memory LRU answers hot lookups; when ``path`` is set every entry is
+    also written to SQLite so results survive restarts. Both layers are capped
+    at ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = EVAL_CACHE_MAX_ENTRIES, ttl_seconds: float = EVAL_CACHE_TTL_SECONDS,
+                 path: Optional[str] = EVAL_CACHE_PATH):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path or None
+        self._memory = OrderedDict()  # key -> (created_at, value)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._db = None
+
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_last_access ON evaluations(last_access)")
+            self._db.commit()
+            logger.info(f"Evaluation cache persisted to {self.path}")
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached value for ``key`` or None, refreshing its LRU position"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT created_at, value FROM evaluations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = (row[0], json.loads(row[1]))
+                    self._memory[key] = entry
+
+            if entry is None or self._expired(entry[0], now):
+                if entry is not None:
+                    self._delete(key)
+                self._misses += 1
+                return None
+
+            self._memory.move_to_end(key)
+            if self._db is not None:
+                self._db.execute("UPDATE evaluations SET last_access = ? WHERE key = ?", (now, key))
+                self._db.commit()
+            self._trim_memory()
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: dict):
+        """Store ``value`` under ``key``, evicting least-recently-used entries over the cap"""
+        now = time.time()
+        with self._lock:
+            self._memory[key] = (now, value)
+            self._memory.move_to_end(key)
+            self._trim_memory()
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO evaluations (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now, now),
+                )
+                overflow = self._db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM evaluations WHERE key IN "
+                        "(SELECT key FROM evaluations ORDER BY last_access ASC LIMIT ?)",
+                        (overflow,),
+                    )
+                    self._evictions += overflow
+                if self.ttl_seconds > 0:
+                    self._db.execute("DELETE FROM evaluations WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._db.commit()
+
+    def _trim_memory(self):
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            if self._db is None:
+                self._evictions += 1
+
+    def _delete(self, key: str):
+        self._memory.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM evaluations WHERE key = ?", (key,))
+            self._db.commit()
+
+    def entries(self) -> List[dict]:
+        """List cached entries (newest first) without their full payload"""
+        with self._lock:
+            if self._db is not None:
+                rows = self._db.execute(
+                    "SELECT key, created_at, value FROM evaluations ORDER BY created_at DESC"
+                ).fetchall()
+                items = [(key, created_at, json.loads(value)) for key, created_at, value in rows]
+            else:
+                items = [(key, created_at, value) for key, (created_at, value) in reversed(self._memory.items())]
+
+        return [
+            {
+                "key": key,
+                "startup": value.get("startup_name"),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(created_at)),
+                "method": value.get("method_used"),
+            }
+            for key, created_at, value in items
+        ]
+
+    def clear(self) -> int:
+        """Remove every entry and return how many were removed"""
+        with self._lock:
+            if self._db is not None:
+                count = self._db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+                self._db.execute("DELETE FROM evaluations")
+                self._db.commit()
+            else:
+                count = len(self._memory)
+            self._memory.clear()
+            return count
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._db is not None:
+                return self._db.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+            return len(self._memory)
+
+    def stats(self) -> dict:
+        size = len(self)
+        return {
+            "backend": "sqlite" if self._db is not None else "memory",
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+        }
+
+
+# Singleton instance
+_evaluation_cache = None
+
+def get_evaluation_cache() -> EvaluationCache:
+    """Get singleton evaluation cache instance"""
+    global _evaluation_cache
+    if _evaluation_cache is None:
+        _evaluation_cache = EvaluationCache()
+    return _evaluation_cache
@@ -0,0 +1,165 @@
+"""Single-pass parser for evaluation reports
+
+Reports follow the format requested from Groq:
+
+    X. [Metric Name]: [Score]/10 — [Analysis]. Strength: ... Weakness: ... Improvement: ...
+    Overall Assessment
+    ...
+
+``EvaluationParser`` consumes text line by line, so it can be fed streamed
+chunks and reports each criterion as soon as the next one starts. It also
+builds the display-formatted text in the same pass.
+"""
+import re
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+_NUMBERED = re.compile(r"^[*#\s]*(\d{1,2})[.)]\s+(.*)$")
+_NAME_AND_BODY = re.compile(r"^\**\s*([^:]+?)\s*\**\s*:\s*(.*)$")
+_SCORE = re.compile(r"(\d+(?:\.\d+)?)\s*/\s*10|Score:\s*(\d+(?:\.\d+)?)", re.IGNORECASE)
+_OVERALL_HEADING = re.compile(
+    r"^[*#\s]*(?:overall|summary|conclusion|final assessment|investment recommendation|recommendation)\b",
+    re.IGNORECASE,
+)
+# Bold markers around a label ("**Strengths:**", "**Weakness**:") belong to the label
+_LABEL = re.compile(r"[*_]*(?<![A-Za-z])(Strengths?|Weakness(?:es)?|Improvements?)[*_]*\s*:\s*[*_]*\s*", re.IGNORECASE)
+_LEADING_PUNCTUATION = re.compile(r"^[\s—–\-:.,*]+")
+
+
+@dataclass
+class CriterionRecord:
+    number: int
+    criterion: str
+    score: Optional[float]
+    text: str
+    analysis: str = ""
+    strength: Optional[str] = None
+    weakness: Optional[str] = None
+    improvement: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class ParsedEvaluation:
+    criteria: List[CriterionRecord] = field(default_factory=list)
+    overall_assessment: str = ""
+    formatted: str = ""
+
+
+def _clean(value: str) -> str:
+    return _LEADING_PUNCTUATION.sub("", value).strip().rstrip(".").strip()
+
+
+def _build_record(number: int, name: str, parts: List[str]) -> CriterionRecord:
+    text = " ".join(parts)
+    score_match = _SCORE.search(text)
+    score = float(score_match.group(1) or score_match.group(2)) if score_match else None
+
+    record = CriterionRecord(number=number, criterion=name, score=score, text=text)
+    # Split "<analysis> Strength: ... Weakness: ... Improvement: ..." in one scan
+    labels = list(_LABEL.finditer(text))
+    analysis_end = labels[0].start() if labels else len(text)
+    analysis = text[score_match.end():analysis_end] if score_match and score_match.end() <= analysis_end else text[:analysis_end]
+    record.analysis = _clean(analysis)
+    for index, label in enumerate(labels):
+        value_end = labels[index + 1].start() if index + 1 < len(labels) else len(text)
+        kind = label.group(1).lower()
+        attribute = "strength" if kind.startswith("strength") else "weakness" if kind.startswith("weakness") else "improvement"
+        setattr(record, attribute, _clean(text[label.end():value_end]))
+    return record
+
+
+class EvaluationParser:
+    """Incremental parser; ``feed`` returns criteria completed by the new text"""
+
+    def __init__(self):
+        self._buffer = ""
+        self._criteria: List[CriterionRecord] = []
+        self._current: Optional[tuple] = None  # (number, name, body parts)
+        self._overall_lines: List[str] = []
+        self._in_overall = False
+        self._formatted: List[str] = []
+
+    def feed(self, chunk: str) -> List[CriterionRecord]:
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        completed = []
+        for line in lines:
+            record = self._process_line(line)
+            if record is not None:
+                completed.append(record)
+        return completed
+
+    def close(self) -> List[CriterionRecord]:
+        """Process any trailing partial line and finish the last criterion"""
+        completed = self.feed("\n")
+        record = self._finish_current()
+        if record is not None:
+            completed.append(record)
+        return completed
+
+    def _finish_current(self) -> Optional[CriterionRecord]:
+        if self._current is None:
+            return None
+        number, name, parts = self._current
+        self._current = None
+        record = _build_record(number, name, parts)
+        self._criteria.append(record)
+        return record
+
+    def _process_line(self, line: str) -> Optional[CriterionRecord]:
+        line = line.strip()
+        if not line:
+            return None
+
+        # Same layout as prompt.format_evaluation_response always produced
+        if (line[0].isdigit() and ". " in line) or line.lower().startswith("overall"):
+            self._formatted.append("\n" + line)
+        else:
+            self._formatted.append(line)
+
+        numbered = _NUMBERED.match(line)
+        if numbered is None and _OVERALL_HEADING.match(line):
+            record = self._finish_current()
+            self._in_overall = True
+            self._overall_lines.append(line)
+            return record
+        if self._in_overall:
+            self._overall_lines.append(line)
+            return None
+
+        if numbered is not None:
+            record = self._finish_current()
+            name_and_body = _NAME_AND_BODY.match(numbered.group(2))
+            if name_and_body is not None:
+                name, body = name_and_body.group(1), name_and_body.group(2)
+                self._current = (int(numbered.group(1)), name.strip("* "), [body] if body else [])
+            else:
+                self._current = (int(numbered.group(1)), numbered.group(2).strip("* "), [])
+            return record
+
+        if self._current is not None:
+            self._current[2].append(line)
+        return None
+
+    def result(self) -> ParsedEvaluation:
+        """Everything parsed so far (call ``close`` first for the final result)"""
+        criteria = list(self._criteria)
+        if self._current is not None:
+            number, name, parts = self._current
+            criteria.append(_build_record(number, name, parts))
+        return ParsedEvaluation(
+            criteria=criteria,
+            overall_assessment=" ".join(self._overall_lines),
+            formatted="\n".join(self._formatted).strip(),
+        )
+
+
+def parse_evaluation(text: str) -> ParsedEvaluation:
+    """Parse a complete evaluation report"""
+    parser = EvaluationParser()
+    parser.feed(text or "")
+    parser.close()
+    return parser.result()
@@ -0,0 +1,107 @@
+"""Export the base model and LoRA adapters as local safetensors artifacts
+
+Usage:
+    python export_models.py -o models/artifacts [--merge]
+    MODEL_ARTIFACTS_DIR=models/artifacts uvicorn main:app
+
+Writes ``base/`` (fp16 weights + tokenizer) and ``adapters/<name>/`` so the
+API loads everything from disk with ``local_files_only``. Loading still
+quantizes the base to 4-bit, but from memory-mapped local safetensors instead
+of the hub. With ``--merge`` each adapter is also merged into its own full
+model under ``merged/<name>/``, ready for vLLM without LoRA or for GGUF
+conversion (``LLAMACPP_MODEL_DIR``). With ``--draft`` the speculative
+decoding draft model is saved under ``draft/``.
+"""
+import argparse
+import json
+import logging
+import os
+import time
+
+import torch
+from peft import PeftModel
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from model_loading import ADAPTERS, BASE_MODEL, DRAFT_MODEL, draft_model_config
+
+logger = logging.getLogger(__name__)
+
+MAX_SHARD_SIZE = "2GB"
+
+
+def _load_base(source: str, **kwargs):
+    return AutoModelForCausalLM.from_pretrained(
+        source,
+        torch_dtype=torch.float16,
+        low_cpu_mem_usage=True,
+        **kwargs
+    )
+
+
+def export_base(output_dir: str) -> str:
+    """Save the fp16 base model and tokenizer as safetensors"""
+    base_dir = os.path.join(output_dir, "base")
+    logger.info(f"Exporting {BASE_MODEL} to {base_dir}...")
+    tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL, use_auth_token=True)
+    tokenizer.save_pretrained(base_dir)
+    model = _load_base(BASE_MODEL, use_auth_token=True)
+    model.save_pretrained(base_dir, safe_serialization=True, max_shard_size=MAX_SHARD_SIZE)
+    del model
+    return base_dir
+
+
+def export_adapter(base_dir: str, output_dir: str, adapter_name: str, merge: bool):
+    """Save one adapter as safetensors and optionally a merged full model"""
+    adapter_dir = os.path.join(output_dir, "adapters", adapter_name)
+    logger.info(f"Exporting {ADAPTERS[adapter_name]} to {adapter_dir}...")
+    # merge_and_unload modifies the base in place, so every adapter gets a fresh copy
+    model = PeftModel.from_pretrained(_load_base(base_dir, local_files_only=True), ADAPTERS[adapter_name])
+    model.save_pretrained(adapter_dir, safe_serialization=True)
+
+    if merge:
+        merged_dir = os.path.join(output_dir, "merged", adapter_name)
+        logger.info(f"Merging {adapter_name} adapter into {merged_dir}...")
+        merged = model.merge_and_unload()
+        merged.save_pretrained(merged_dir, safe_serialization=True, max_shard_size=MAX_SHARD_SIZE)
+        AutoTokenizer.from_pretrained(base_dir, local_files_only=True).save_pretrained(merged_dir)
+    del model
+
+
+def export_draft(output_dir: str):
+    """Save the speculative decoding draft model as safetensors"""
+    draft_dir = os.path.join(output_dir, "draft")
+    logger.info(f"Exporting {DRAFT_MODEL} to {draft_dir}...")
+    model = _load_base(DRAFT_MODEL, config=draft_model_config(DRAFT_MODEL, use_auth_token=True), use_auth_token=True)
+    model.save_pretrained(draft_dir, safe_serialization=True, max_shard_size=MAX_SHARD_SIZE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export models as local safetensors artifacts")
+    parser.add_argument("-o", "--output", default="models/artifacts", help="Artifacts directory")
+    parser.add_argument("--merge", action="store_true", help="Also write one merged model per adapter")
+    parser.add_argument("--draft", action="store_true", help="Also export the speculative decoding draft model")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    start = time.time()
+
+    base_dir = export_base(args.output)
+    for adapter_name in ADAPTERS:
+        export_adapter(base_dir, args.output, adapter_name, args.merge)
+    if args.draft:
+        export_draft(args.output)
+
+    manifest = {
+        "base_model": BASE_MODEL,
+        "adapters": ADAPTERS,
+        "merged": args.merge,
+        "draft_model": DRAFT_MODEL if args.draft else None,
+        "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(os.path.join(args.output, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    logger.info(f"Export finished in {time.time() - start:.0f} seconds")
+
+
+if __name__ == "__main__":
+    main()
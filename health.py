@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+GROQ_HEALTH_INTERVAL = float(os.getenv("GROQ_HEALTH_INTERVAL", "300"))
+
+
+class UpstreamMonitor:
+    """Periodically checks an upstream dependency and caches the last result
+
+    Health endpoints read ``snapshot()`` instead of calling the upstream, so
+    probes stay cheap no matter how often the load balancer hits them.
+    """
+
+    def __init__(self, name: str, check: Callable[[], Awaitable[dict]], interval: float):
+        self.name = name
+        self.interval = interval
+        self._check = check
+        self._status: Optional[dict] = None
+        self._checked_at: Optional[float] = None
+        self._checked_at_wall: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> dict:
+        """Run the check now and cache its result"""
+        try:
+            status = await self._check()
+        except Exception as e:
+            logger.error(f"{self.name} health check failed: {str(e)}")
+            status = {"status": "error", "error": str(e)}
+
+        self._status = status
+        self._checked_at = time.monotonic()
+        self._checked_at_wall = datetime.now()
+        return status
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            logger.info(f"{self.name} health: {self._status.get('status')}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start checking in the background every ``interval`` seconds"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def snapshot(self) -> dict:
+        """Return the last cached result with its age"""
+        if self._status is None:
+            return {"status": "unknown", "last_checked": None, "age_seconds": None, "check_interval": self.interval}
+
+        return {
+            **self._status,
+            "last_checked": self._checked_at_wall.isoformat(),
+            "age_seconds": round(time.monotonic() - self._checked_at, 1),
+            "check_interval": self.interval,
+        }
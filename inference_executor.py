@@ -0,0 +1,124 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+MODEL_WORKERS = int(os.getenv("MODEL_WORKERS", "1"))
+MODEL_QUEUE_SIZE = int(os.getenv("MODEL_QUEUE_SIZE", "8"))
+
+
+class QueueFullError(RuntimeError):
+    """Raised when an executor has no free worker or queue slot"""
+
+
+class BoundedExecutor:
+    """Thread pool with a bounded number of queued + running tasks
+
+    Blocking work (model loading and generation) is handed to a dedicated
+    pool so the FastAPI event loop stays free. Submissions beyond
+    ``max_workers + max_queue`` are rejected instead of piling up.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _acquire_slot(self):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise QueueFullError(f"{self.name} queue is full ({self.max_workers + self.max_queue} tasks pending)")
+        with self._lock:
+            self._in_flight += 1
+
+    def _release_slot(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+            self._completed += 1
+        self._slots.release()
+
+    def _track(self, fn):
+        @functools.wraps(fn)
+        def wrapper():
+            with self._lock:
+                self._active += 1
+            try:
+                return fn()
+            finally:
+                with self._lock:
+                    self._active -= 1
+        return wrapper
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Submit blocking work and return a concurrent Future"""
+        self._acquire_slot()
+        try:
+            future = self._executor.submit(self._track(functools.partial(fn, *args, **kwargs)))
+        except Exception:
+            self._release_slot()
+            raise
+        future.add_done_callback(self._release_slot)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Run blocking work in the pool and await its result"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    @property
+    def queue_depth(self) -> int:
+        with self._lock:
+            return self._in_flight - self._active
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self._active,
+                "queued": self._in_flight - self._active,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+# Singleton executors
+_model_executor = None
+
+def get_model_executor() -> BoundedExecutor:
+    """Get the executor that runs local model loading and generation"""
+    global _model_executor
+    if _model_executor is None:
+        _model_executor = BoundedExecutor("model", MODEL_WORKERS, MODEL_QUEUE_SIZE)
+        logger.info(f"Model executor started with {MODEL_WORKERS} worker(s), queue size {MODEL_QUEUE_SIZE}")
+    return _model_executor
+
+def get_executor_stats() -> dict:
+    """Get queue statistics for all executors that have been started"""
+    return {
+        executor.name: executor.stats()
+        for executor in (_model_executor,)
+        if executor is not None
+    }
+
+def shutdown_executors():
+    """Stop all executors, cancelling queued work"""
+    global _model_executor
+    if _model_executor is not None:
+        _model_executor.shutdown()
+    _model_executor = None
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from inference_executor import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "data/jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Retries while the model queue is full, with exponential backoff capped at JOB_RETRY_MAX_DELAY
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "20"))
+JOB_RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", "30"))
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+# Called with (event, payload); payload carries stage/progress/message/text
+EventCallback = Callable[[str, dict], None]
+JobRunner = Callable[[dict, EventCallback], Awaitable[dict]]
+
+
+class JobStore:
+    """SQLite-backed store of job state so queued work survives restarts"""
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, "
+                "stage TEXT, progress REAL NOT NULL DEFAULT 0, message TEXT, stages TEXT NOT NULL DEFAULT '[]', "
+                "request TEXT NOT NULL, result TEXT, error TEXT, "
+                "created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at)")
+            self._db.commit()
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["stages"] = json.loads(job["stages"])
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def create(self, kind: str, request: dict) -> dict:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, progress, request, created_at, updated_at) "
+                "VALUES (?, ?, 'queued', 0, ?, ?, ?)",
+                (job_id, kind, json.dumps(request, ensure_ascii=False), now, now),
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def update(self, job_id: str, **fields):
+        if "stages" in fields:
+            fields["stages"] = json.dumps(fields["stages"])
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list(self, limit: int = 50, status: Optional[str] = None) -> List[dict]:
+        query = "SELECT id, kind, status, stage, progress, message, error, created_at, updated_at FROM jobs"
+        params = []
+        if status:
+            query += " WHERE status = ?"
+            params.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, params).fetchall()]
+
+    def unfinished(self) -> List[str]:
+        """Ids of queued or interrupted jobs, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at ASC"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+
+class JobManager:
+    """Runs jobs from a persistent store on a fixed number of asyncio workers
+
+    The runner reports ``stage`` events (persisted with their progress) and
+    ``token`` events (broadcast to subscribers only). Jobs left queued or
+    running by a previous process are re-queued on ``start``. A job that
+    finds the model queue full waits and retries instead of failing.
+    """
+
+    def __init__(self, store: JobStore, runners: Dict[str, JobRunner], workers: int = JOB_WORKERS):
+        self.store = store
+        self.runners = runners
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        resumed = self.store.unfinished()
+        for job_id in resumed:
+            self.store.update(job_id, status="queued")
+            self._queue.put_nowait(job_id)
+        if resumed:
+            logger.info(f"Re-queued {len(resumed)} unfinished job(s)")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind: str, request: dict) -> dict:
+        if kind not in self.runners:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = self.store.create(kind, request)
+        await self._queue.put(job["id"])
+        logger.info(f"Queued {kind} job {job['id']}")
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Get a queue that receives (event, payload) tuples for ``job_id``"""
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    def _publish(self, job_id: str, event: str, payload: dict):
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait((event, payload))
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run_with_retry(self, job: dict, on_event: EventCallback) -> dict:
+        for attempt in range(JOB_MAX_ATTEMPTS):
+            try:
+                return await self.runners[job["kind"]](job["request"], on_event)
+            except QueueFullError:
+                # Model queue saturated; back off instead of failing the job
+                if attempt == JOB_MAX_ATTEMPTS - 1:
+                    raise
+                delay = min(2 ** attempt, JOB_RETRY_MAX_DELAY)
+                on_event("stage", {"stage": "waiting", "progress": 0.0,
+                                   "message": f"Model busy, retrying in {delay:.0f}s..."})
+                await asyncio.sleep(delay)
+
+    async def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None or job["status"] in TERMINAL_STATUSES:
+            return
+
+        stages = []
+        started = time.time()
+        self.store.update(job_id, status="running", stages=stages)
+        self._publish(job_id, "status", {"status": "running"})
+
+        def on_event(event: str, payload: dict):
+            if event == "stage":
+                now = time.time()
+                if stages:
+                    stages[-1]["duration"] = round(now - stages[-1]["started_at"], 3)
+                stages.append({"stage": payload["stage"], "started_at": now})
+                self.store.update(
+                    job_id, stage=payload["stage"], progress=payload.get("progress", 0.0),
+                    message=payload.get("message"), stages=stages
+                )
+            self._publish(job_id, event, payload)
+
+        try:
+            result = await self._run_with_retry(job, on_event)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            logger.error(f"Job {job_id} failed: {error}")
+            self.store.update(job_id, status="failed", error=error, stages=stages)
+            self._publish(job_id, "error", {"detail": error})
+            return
+
+        if stages:
+            stages[-1]["duration"] = round(time.time() - stages[-1]["started_at"], 3)
+        self.store.update(job_id, status="completed", stage="done", progress=1.0, result=result, stages=stages)
+        logger.info(f"Job {job_id} completed in {time.time() - started:.2f} seconds")
+        self._publish(job_id, "done", result)
@@ -1,30 +1,62 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from pydantic import BaseModel, Field, ValidationError, model_validator
+from typing import Callable, List, Dict, Optional, Tuple
 import logging
 import asyncio
 import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
 from datetime import datetime
 
 # Import our modules
 from model_loading import (
-    get_question_model, 
-    get_eval_model, 
-    generate_response, 
     get_model_info,
-    cleanup_models
+    get_load_states,
+    preload_models,
+    cleanup_models,
+    release_idle_models,
+    PRELOAD_MODELS,
+    create_streamer,
+    stream_for_adapter,
+    QUESTION_ADAPTER_NAME,
+    EVAL_ADAPTER_NAME,
+    BASE_MODEL,
+    EVAL_ADAPTER
 )
 from prompt import (
-    build_question_prompt, 
-    build_evaluation_prompt,
+    question_prompt_segments,
+    evaluation_prompt_segments,
     build_groq_enhancement_prompt,
+    build_groq_structured_evaluation_prompt,
     build_groq_question_enhancement_prompt,
+    build_groq_direct_question_prompt,
     parse_questions_from_response,
+    render_structured_evaluation,
     validate_startup_data,
-    format_evaluation_response
+    EVALUATION_METRICS
 )
-from my_groq import get_groq_client, test_groq_setup
+from evaluation_parser import EvaluationParser, parse_evaluation
+from my_groq import get_groq_client, test_groq_setup, close_groq_client
+from inference_executor import (
+    get_model_executor,
+    get_executor_stats,
+    shutdown_executors,
+    QueueFullError,
+    MODEL_WORKERS
+)
+from batching import get_batch_scheduler
+from evaluation_cache import get_evaluation_cache, make_cache_key
+from health import UpstreamMonitor, GROQ_HEALTH_INTERVAL
+from jobs import JobManager, JobStore, EventCallback
+from batch import BatchRun, check_parquet_support, load_rows, BATCH_CONCURRENCY
+from routing import AdaptiveRouter
 
 # Setup logging
 logging.basicConfig(
@@ -62,6 +94,46 @@ class EvaluationRequest(BaseModel):
     questions: List[str]
     answers: List[str]
     enhance_with_groq: bool = True
+    # Ask Groq for JSON-mode output validated against StructuredEvaluation
+    structured_output: bool = False
+
+class EvaluationCriterion(BaseModel):
+    number: int
+    criterion: str
+    score: Optional[float] = None
+    text: str
+    analysis: str = ""
+    strength: Optional[str] = None
+    weakness: Optional[str] = None
+    improvement: Optional[str] = None
+
+class StructuredMetric(BaseModel):
+    number: int = Field(ge=1, le=len(EVALUATION_METRICS))
+    name: str
+    score: float = Field(ge=0, le=10)
+    analysis: str
+    strength: str
+    weakness: str
+    improvement: str
+
+def _metric_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", name.casefold().replace("&", " and ")).strip()
+
+class StructuredEvaluation(BaseModel):
+    metrics: List[StructuredMetric] = Field(min_length=len(EVALUATION_METRICS), max_length=len(EVALUATION_METRICS))
+    overall_assessment: str
+
+    @model_validator(mode="after")
+    def check_metrics(self):
+        """Every metric exactly once, named as in EVALUATION_METRICS"""
+        numbers = sorted(metric.number for metric in self.metrics)
+        if numbers != list(range(1, len(EVALUATION_METRICS) + 1)):
+            raise ValueError(f"Metric numbers must be 1-{len(EVALUATION_METRICS)} once each, got {numbers}")
+        for metric in self.metrics:
+            expected = EVALUATION_METRICS[metric.number - 1]
+            if _metric_key(metric.name) != _metric_key(expected):
+                raise ValueError(f"Metric {metric.number} should be {expected!r}, got {metric.name!r}")
+        return self
 
 class EvaluationResponse(BaseModel):
     evaluation: str
@@ -70,6 +142,10 @@ class EvaluationResponse(BaseModel):
     method_used: str
     processing_time: float
     timestamp: str
+    cached: bool = False
+    criteria: List[EvaluationCriterion] = []
+    overall_assessment: Optional[str] = None
+    structured: Optional[StructuredEvaluation] = None
 
 class QuestionResponse(BaseModel):
     questions: List[str]
@@ -78,18 +154,589 @@ class QuestionResponse(BaseModel):
     method_used: str
     processing_time: float
 
-# Global variables for caching
-startup_evaluations = {}
+class JobSubmission(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    events_url: str
+
+# Seconds to wait for the next streamed token before giving up
+STREAM_TIMEOUT = float(os.getenv("STREAM_TIMEOUT", "300"))
+
+# Generation settings for the fine-tuned evaluation model (part of the cache key)
+EVAL_MAX_NEW_TOKENS = 4000
+EVAL_TEMPERATURE = 0.6
+
+# "sequential": Groq refines the fine-tuned questions after they are generated.
+# "pipelined": Groq writes questions from the startup info alone while the
+# fine-tuned model runs, and the two are reconciled, so latency is close to the
+# slower of the two stages instead of their sum.
+QUESTION_PIPELINE = os.getenv("QUESTION_PIPELINE", "sequential")
+
+GENERIC_QUESTIONS = [
+    "What is your customer acquisition strategy?",
+    "How do you plan to achieve profitability?",
+    "What are your biggest risks and how do you mitigate them?"
+]
+
+def select_final_questions(raw_questions: List[str], enhanced_output: Optional[str]):
+    """Pick the final 10 questions from fine-tuned and Groq-enhanced output"""
+    final_questions = list(raw_questions)
+    method_used = "fine_tuned_only"
+    
+    if enhanced_output is not None:
+        if not enhanced_output.startswith("Error:"):
+            enhanced_questions = parse_questions_from_response(enhanced_output)
+            if len(enhanced_questions) >= 8:  # Ensure we got good questions
+                final_questions = enhanced_questions[:10]
+                method_used = "fine_tuned_plus_groq_enhanced"
+                logger.info("Questions enhanced with Groq successfully")
+            else:
+                logger.warning("Groq enhancement didn't produce enough questions, using original")
+        else:
+            logger.warning(f"Groq enhancement failed: {enhanced_output}")
+    
+    # Ensure we have exactly 10 questions, padding with generic ones if needed
+    for generic_question in GENERIC_QUESTIONS:
+        if len(final_questions) >= 10:
+            break
+        final_questions.append(generic_question)
+    
+    return final_questions[:10], method_used
+
+def _question_key(question: str) -> frozenset:
+    return frozenset(word for word in question.lower().strip("?").split() if len(word) > 3)
+
+def reconcile_questions(raw_questions: List[str], groq_output: Optional[str]):
+    """Combine questions Groq wrote in parallel with the fine-tuned model's questions
+
+    Groq's questions come first; fine-tuned questions that don't overlap any of
+    them fill the remaining slots. Falls back to the fine-tuned questions if
+    Groq failed or returned too few.
+    """
+    if groq_output is None or groq_output.startswith("Error:"):
+        logger.warning(f"Parallel Groq questions failed: {groq_output}")
+        return select_final_questions(raw_questions, None)
+    
+    groq_questions = parse_questions_from_response(groq_output)
+    if len(groq_questions) < 8:
+        logger.warning("Parallel Groq call didn't produce enough questions, using original")
+        return select_final_questions(raw_questions, None)
+    
+    final_questions = groq_questions[:10]
+    keys = [_question_key(question) for question in final_questions]
+    for question in raw_questions:
+        if len(final_questions) >= 10:
+            break
+        key = _question_key(question)
+        # Skip questions sharing most of their words with one already chosen
+        if all(len(key & other) < 0.5 * max(1, min(len(key), len(other))) for other in keys):
+            final_questions.append(question)
+            keys.append(key)
+    
+    final_questions, _ = select_final_questions(final_questions, None)
+    logger.info("Questions reconciled from parallel Groq and fine-tuned output")
+    return final_questions, "fine_tuned_plus_groq_parallel"
+
+def merge_enhanced_evaluation(raw_evaluation: str, enhanced_evaluation: str):
+    """Combine the fine-tuned evaluation with Groq's enhanced version"""
+    if not enhanced_evaluation.startswith("Error:"):
+        logger.info("Evaluation enhanced with Groq successfully")
+        return enhanced_evaluation, "fine_tuned_plus_groq_enhanced"
+    
+    logger.warning(f"Groq enhancement failed: {enhanced_evaluation}")
+    return (
+        f"ORIGINAL MODEL EVALUATION:\n\n{raw_evaluation}\n\nNOTE: Groq enhancement failed - {enhanced_evaluation}",
+        "fine_tuned_with_groq_error"
+    )
+
+def validate_evaluation_request(data: EvaluationRequest):
+    """Raise a 400 HTTPException if the evaluation request is invalid"""
+    is_valid, error_msg = validate_startup_data(data.startup.dict())
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_msg)
+    
+    if len(data.questions) != len(data.answers):
+        raise HTTPException(status_code=400, detail="Number of questions and answers must match")
+    
+    if len(data.questions) < 5:
+        raise HTTPException(status_code=400, detail="At least 5 questions required for evaluation")
+
+def evaluation_cache_key(data: EvaluationRequest) -> str:
+    """Stable cache key for everything that determines an evaluation's output"""
+    return make_cache_key(
+        data.startup.dict(),
+        data.questions,
+        data.answers,
+        adapter=f"{BASE_MODEL}+{EVAL_ADAPTER}",
+        generation_params={
+            "max_new_tokens": EVAL_MAX_NEW_TOKENS,
+            "temperature": EVAL_TEMPERATURE,
+            "enhance_with_groq": data.enhance_with_groq,
+            "structured_output": data.structured_output
+        }
+    )
+
+def lookup_cached_evaluation(data: EvaluationRequest, start_time: datetime) -> Optional[EvaluationResponse]:
+    """Return a cached EvaluationResponse for this request, if there is one"""
+    cached = get_evaluation_cache().get(evaluation_cache_key(data))
+    if cached is None:
+        return None
+    
+    logger.info(f"Serving cached evaluation for startup: {data.startup.name}")
+    fields = {key: value for key, value in cached.items() if key != "startup_name"}
+    if "criteria" not in fields:
+        # Entries cached before criteria were returned
+        parsed = parse_evaluation(fields["evaluation"])
+        fields.update(
+            criteria=[record.to_dict() for record in parsed.criteria],
+            overall_assessment=parsed.overall_assessment or None
+        )
+    fields.update(
+        processing_time=(datetime.now() - start_time).total_seconds(),
+        cached=True
+    )
+    return EvaluationResponse(**fields)
+
+def evaluation_failed(result: EvaluationResponse) -> bool:
+    """Whether the local model or Groq failed and the pipeline fell back to an error result"""
+    return result.method_used.endswith("error") or any(
+        (text or "").startswith("Error generating response")
+        for text in (result.evaluation, result.raw_evaluation)
+    )
+
+def remember_evaluation(data: EvaluationRequest, result: EvaluationResponse):
+    """Store a finished evaluation in the evaluation cache"""
+    # Don't cache failures (of the local model, or of a requested Groq
+    # enhancement) so they are retried on the next submission, nor Groq-only
+    # fallbacks taken under load so the full pipeline runs next time
+    enhancement_failed = data.enhance_with_groq and not result.method_used.endswith("enhanced")
+    if evaluation_failed(result) or result.method_used == "groq_only" or enhancement_failed:
+        return
+    
+    value = result.dict()
+    value["startup_name"] = data.startup.name
+    get_evaluation_cache().set(evaluation_cache_key(data), value)
+
+# Upstream connectivity is checked in the background; probes read the cached result
+groq_monitor = UpstreamMonitor("groq", test_groq_setup, GROQ_HEALTH_INTERVAL)
+
+def local_backlog() -> int:
+    """Local generations waiting for or holding a model worker"""
+    executor_stats = get_model_executor().stats()
+    return executor_stats["active"] + executor_stats["queued"] + get_batch_scheduler().stats()["pending_prompts"]
+
+# Routes requests to Groq alone when the local model queue is saturated
+router = AdaptiveRouter(local_backlog, MODEL_WORKERS, lambda: groq_monitor.snapshot().get("status") == "ready")
+
+# Created on startup so the job database is only opened by the server process
+job_manager: Optional[JobManager] = None
+
+# Background model preload started on startup (None when PRELOAD_MODELS is off)
+preload_task: Optional[asyncio.Task] = None
+
+# Seconds between keep-alive comments on idle job event streams
+JOB_EVENTS_KEEPALIVE = 15.0
+
+# Batch runs: inputs, results and metadata live under BATCH_DIR/<batch_id>/
+BATCH_DIR = os.getenv("BATCH_DIR", "data/batches")
+batch_runs: Dict[str, BatchRun] = {}
+_batch_tasks: Dict[str, asyncio.Task] = {}
+
+def sse_event(event: str, data: dict) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def submit_stream(adapter_name: str, prompt, max_new_tokens: int, temperature: float):
+    """Start a streamed generation on the model executor; returns (streamer, future, cancel)
+
+    The streamer's token timeout starts when a worker picks the generation up,
+    so time spent queued behind other generations does not count against it.
+    Setting ``cancel`` stops the generation at its next token.
+    """
+    streamer = create_streamer(timeout=None)
+    cancel = threading.Event()
+    
+    def generate():
+        if cancel.is_set():
+            streamer.end()
+            return ""
+        streamer.timeout = STREAM_TIMEOUT
+        return stream_for_adapter(adapter_name, prompt, streamer, max_new_tokens, temperature, cancel)
+    
+    future = get_model_executor().submit(generate)
+    # A generation cancelled before it started would otherwise never end the stream
+    future.add_done_callback(lambda done: streamer.end() if done.cancelled() else None)
+    return streamer, future, cancel
+
+async def iterate_stream(streamer):
+    """Yield a streamer's text chunks, turning a token timeout into a readable error"""
+    try:
+        async for text in iterate_in_threadpool(streamer):
+            yield text
+    except queue.Empty:
+        raise TimeoutError(f"No tokens generated for {STREAM_TIMEOUT:.0f} seconds")
+
+async def run_groq_only_questions(data: StartupInfo, start_time: datetime) -> Optional[QuestionResponse]:
+    """Write the questions with Groq alone; None if Groq didn't produce enough"""
+    try:
+        groq_output = await get_groq_client().enhance_questions(build_groq_direct_question_prompt(data.dict()))
+    except Exception as e:
+        logger.warning(f"Groq-only questions failed, using the local model: {str(e)}")
+        return None
+    
+    groq_questions = [] if groq_output.startswith("Error:") else parse_questions_from_response(groq_output)
+    if len(groq_questions) < 8:
+        logger.warning("Groq-only questions were insufficient, using the local model")
+        return None
+    
+    final_questions, _ = select_final_questions(groq_questions, None)
+    return QuestionResponse(
+        questions=final_questions,
+        count=len(final_questions),
+        method_used="groq_only",
+        processing_time=(datetime.now() - start_time).total_seconds()
+    )
+
+async def run_question_pipeline(data: StartupInfo) -> QuestionResponse:
+    """Generate questions with the fine-tuned model, then enhance them with Groq"""
+    start_time = datetime.now()
+    
+    logger.info(f"Generating questions for startup: {data.name}")
+    
+    if router.use_groq_only("questions"):
+        result = await run_groq_only_questions(data, start_time)
+        if result is not None:
+            return result
+    
+    # Step 1: Generate questions using fine-tuned model
+    prompt = question_prompt_segments(data.dict())
+    local_started = time.monotonic()
+    local_generation = get_batch_scheduler().submit(
+        prompt, QUESTION_ADAPTER_NAME, max_new_tokens=1024, temperature=0.7
+    )
+    
+    if QUESTION_PIPELINE == "pipelined":
+        async def groq_direct_questions():
+            try:
+                return await get_groq_client().enhance_questions(build_groq_direct_question_prompt(data.dict()))
+            except Exception as e:
+                logger.warning(f"Parallel Groq questions failed, using fine-tuned only: {str(e)}")
+                return None
+        
+        # Speculatively ask Groq for questions from the startup info while the local model runs
+        groq_generation = asyncio.create_task(groq_direct_questions())
+        try:
+            raw_output = await local_generation
+        except BaseException:
+            groq_generation.cancel()
+            raise
+        router.record_local("questions", time.monotonic() - local_started)
+        raw_questions = parse_questions_from_response(raw_output)
+        logger.info(f"Fine-tuned model generated {len(raw_questions)} questions")
+        
+        final_questions, method_used = reconcile_questions(raw_questions, await groq_generation)
+    else:
+        raw_output = await local_generation
+        router.record_local("questions", time.monotonic() - local_started)
+        
+        # Parse questions from raw output
+        raw_questions = parse_questions_from_response(raw_output)
+        
+        logger.info(f"Fine-tuned model generated {len(raw_questions)} questions")
+        
+        # Step 2: Enhance with Groq (optional fallback)
+        enhanced_output = None
+        
+        try:
+            groq_client = get_groq_client()
+            enhancement_prompt = build_groq_question_enhancement_prompt(data.dict(), raw_questions)
+            enhanced_output = await groq_client.enhance_questions(enhancement_prompt)
+        except Exception as e:
+            logger.warning(f"Groq enhancement failed, using fine-tuned only: {str(e)}")
+        
+        final_questions, method_used = select_final_questions(raw_questions, enhanced_output)
+    
+    processing_time = (datetime.now() - start_time).total_seconds()
+    
+    logger.info(f"Questions generated successfully in {processing_time:.2f} seconds")
+    
+    return QuestionResponse(
+        questions=final_questions,
+        raw_questions=raw_questions if method_used != "fine_tuned_only" else None,
+        count=len(final_questions),
+        method_used=method_used,
+        processing_time=processing_time
+    )
+
+def emit_criteria(emit: Callable[..., None], records):
+    """Send a ``criterion`` event for each criterion parsed from streamed text"""
+    for record in records:
+        emit("criterion", **record.to_dict())
+
+async def request_structured_evaluation(data: EvaluationRequest,
+                                        raw_evaluation: Optional[str] = None) -> Optional[StructuredEvaluation]:
+    """Ask Groq for the evaluation in JSON mode; None if the call or validation failed"""
+    prompt = build_groq_structured_evaluation_prompt(
+        data.startup.dict(), data.questions, data.answers, raw_evaluation
+    )
+    response = await get_groq_client().enhance_evaluation_json(prompt)
+    if response.startswith("Error:"):
+        logger.warning(f"Structured evaluation failed, falling back to text: {response}")
+        return None
+    
+    try:
+        structured = StructuredEvaluation.model_validate_json(response)
+    except ValidationError as e:
+        logger.warning(f"Structured evaluation did not match the schema, falling back to text: {str(e)}")
+        return None
+    
+    # Keep the report in EVALUATION_METRICS order even if the model reordered it
+    structured.metrics.sort(key=lambda metric: metric.number)
+    return structured
+
+def structured_evaluation_text(structured: StructuredEvaluation, emit: Callable[..., None]) -> str:
+    """Render a structured evaluation as report text and send its criteria events"""
+    text = render_structured_evaluation(structured.model_dump())
+    emit_criteria(emit, parse_evaluation(text).criteria)
+    return text
+
+async def run_local_evaluation(data: EvaluationRequest, emit: Callable[..., None], stream_tokens: bool):
+    """Generate the evaluation with the fine-tuned model and optionally enhance it with Groq
+
+    Returns (raw_evaluation, final_evaluation, method_used, structured).
+    """
+    # Step 1: Generate raw evaluation using fine-tuned model
+    emit("stage", stage="fine_tuned", progress=0.05, message="Fine-tuned model generating evaluation...")
+    local_started = time.monotonic()
+    eval_prompt = evaluation_prompt_segments(data.startup.dict(), data.questions, data.answers)
+    
+    if stream_tokens:
+        streamer, future, cancel = submit_stream(EVAL_ADAPTER_NAME, eval_prompt, EVAL_MAX_NEW_TOKENS, EVAL_TEMPERATURE)
+        generated_chars = 0
+        try:
+            async for text in iterate_stream(streamer):
+                generated_chars += len(text)
+                # Approximate progress: ~4 characters per token against the token budget
+                progress = 0.05 + 0.55 * min(1.0, generated_chars / 4 / EVAL_MAX_NEW_TOKENS)
+                emit("token", stage="fine_tuned", text=text, progress=round(progress, 3))
+            raw_evaluation = await asyncio.wrap_future(future)
+        finally:
+            # No-op once finished; otherwise the pipeline was cancelled (client went away) or timed out
+            cancel.set()
+    else:
+        raw_evaluation = await get_batch_scheduler().submit(
+            eval_prompt, EVAL_ADAPTER_NAME, max_new_tokens=EVAL_MAX_NEW_TOKENS, temperature=EVAL_TEMPERATURE
+        )
+    
+    router.record_local("evaluation", time.monotonic() - local_started)
+    logger.info("Raw evaluation generated by fine-tuned model")
+    
+    # Step 2: Always enhance with Groq (this is the pipeline you requested)
+    final_evaluation = raw_evaluation
+    method_used = "fine_tuned_error" if raw_evaluation.startswith("Error generating response") else "fine_tuned_only"
+    
+    structured = None
+    
+    if data.enhance_with_groq:
+        emit("stage", stage="groq", progress=0.6, message="Groq enhancing evaluation...")
+        try:
+            groq_client = get_groq_client()
+            if data.structured_output:
+                structured = await request_structured_evaluation(data, raw_evaluation)
+            
+            if structured is not None:
+                enhanced_evaluation = structured_evaluation_text(structured, emit)
+            else:
+                enhancement_prompt = build_groq_enhancement_prompt(
+                    data.startup.dict(), 
+                    data.questions, 
+                    data.answers, 
+                    raw_evaluation
+                )
+                
+                if stream_tokens:
+                    chunks = []
+                    generated_chars = 0
+                    parser = EvaluationParser()
+                    async for text in groq_client.stream_evaluation(enhancement_prompt):
+                        chunks.append(text)
+                        generated_chars += len(text)
+                        progress = 0.6 + 0.3 * min(1.0, generated_chars / 4 / 3000)
+                        emit("token", stage="groq", text=text, progress=round(progress, 3))
+                        emit_criteria(emit, parser.feed(text))
+                    emit_criteria(emit, parser.close())
+                    enhanced_evaluation = "".join(chunks).strip()
+                    if len(enhanced_evaluation) <= 50:
+                        enhanced_evaluation = "Error: Groq returned insufficient content"
+                else:
+                    enhanced_evaluation = await groq_client.enhance_evaluation(enhancement_prompt)
+            
+            final_evaluation, method_used = merge_enhanced_evaluation(raw_evaluation, enhanced_evaluation)
+                
+        except Exception as e:
+            logger.warning(f"Groq enhancement failed: {str(e)}")
+            final_evaluation = f"ORIGINAL MODEL EVALUATION:\n\n{raw_evaluation}\n\nNOTE: Groq enhancement failed due to: {str(e)}"
+            method_used = "fine_tuned_with_groq_error"
+            structured = None
+    
+    return raw_evaluation, final_evaluation, method_used, structured
+
+async def run_groq_only_evaluation(data: EvaluationRequest, emit: Callable[..., None],
+                                   stream_tokens: bool) -> Optional[Tuple[str, Optional[StructuredEvaluation]]]:
+    """Write the evaluation with Groq alone
+
+    Returns (evaluation, structured), or None if Groq failed.
+    """
+    emit("stage", stage="groq", progress=0.05, message="Local model busy, Groq writing evaluation...")
+    prompt = build_groq_enhancement_prompt(data.startup.dict(), data.questions, data.answers)
+    structured = None
+    try:
+        groq_client = get_groq_client()
+        if data.structured_output:
+            structured = await request_structured_evaluation(data)
+        
+        if structured is not None:
+            evaluation = structured_evaluation_text(structured, emit)
+        elif stream_tokens:
+            chunks = []
+            generated_chars = 0
+            parser = EvaluationParser()
+            async for text in groq_client.stream_evaluation(prompt):
+                chunks.append(text)
+                generated_chars += len(text)
+                progress = 0.05 + 0.85 * min(1.0, generated_chars / 4 / 3000)
+                emit("token", stage="groq", text=text, progress=round(progress, 3))
+                emit_criteria(emit, parser.feed(text))
+            emit_criteria(emit, parser.close())
+            evaluation = "".join(chunks).strip()
+        else:
+            evaluation = await groq_client.enhance_evaluation(prompt)
+    except Exception as e:
+        logger.warning(f"Groq-only evaluation failed, using the local model: {str(e)}")
+        return None
+    
+    if evaluation.startswith("Error:") or len(evaluation) <= 50:
+        logger.warning(f"Groq-only evaluation failed, using the local model: {evaluation[:200]}")
+        return None
+    return evaluation, structured
+
+async def run_evaluation_pipeline(data: EvaluationRequest, on_event: Optional[EventCallback] = None,
+                                  stream_tokens: bool = False) -> EvaluationResponse:
+    """Run the full evaluation: cache lookup, fine-tuned model, Groq, formatting
+
+    ``on_event`` receives ``stage`` events carrying overall progress (0-1) and,
+    when ``stream_tokens`` is set, ``token`` events with generated text.
+    """
+    start_time = datetime.now()
+    
+    def emit(event: str, **payload):
+        if on_event is not None:
+            on_event(event, payload)
+    
+    cached_result = lookup_cached_evaluation(data, start_time)
+    if cached_result is not None:
+        emit("stage", stage="cache_hit", progress=1.0, message="Evaluation served from cache")
+        return cached_result
+    
+    logger.info(f"Evaluating startup: {data.startup.name}")
+    
+    groq_only_evaluation = None
+    if data.enhance_with_groq and router.use_groq_only("evaluation"):
+        groq_only_evaluation = await run_groq_only_evaluation(data, emit, stream_tokens)
+    
+    if groq_only_evaluation is not None:
+        raw_evaluation = None
+        final_evaluation, structured = groq_only_evaluation
+        method_used = "groq_only"
+    else:
+        raw_evaluation, final_evaluation, method_used, structured = await run_local_evaluation(data, emit, stream_tokens)
+    
+    # Format the final evaluation and extract its criteria in one pass
+    emit("stage", stage="formatting", progress=0.95, message="Formatting evaluation report...")
+    parsed = parse_evaluation(final_evaluation)
+    final_evaluation = parsed.formatted or "No evaluation generated."
+    
+    processing_time = (datetime.now() - start_time).total_seconds()
+    
+    logger.info(f"Evaluation completed successfully in {processing_time:.2f} seconds using {method_used}")
+    
+    result = EvaluationResponse(
+        evaluation=final_evaluation,
+        raw_evaluation=raw_evaluation if method_used.endswith("enhanced") else None,
+        questions_used=data.questions,
+        method_used=method_used,
+        processing_time=processing_time,
+        timestamp=datetime.now().isoformat(),
+        criteria=[record.to_dict() for record in parsed.criteria],
+        overall_assessment=parsed.overall_assessment or None,
+        structured=structured
+    )
+    
+    # Cache the result
+    remember_evaluation(data, result)
+    
+    return result
+
+async def process_batch_row(row: dict) -> dict:
+    """Evaluate one batch row, or generate questions for it when it has no answers
+
+    Raises if generation failed, so the row is journaled as an error and
+    retried when the batch is resumed.
+    """
+    if not row["answers"]:
+        startup = StartupInfo(**row["startup"])
+        is_valid, error_msg = validate_startup_data(startup.dict())
+        if not is_valid:
+            raise ValueError(error_msg)
+        result = await run_question_pipeline(startup)
+        if any(question in GENERIC_QUESTIONS for question in result.questions):
+            raise RuntimeError("Question generation fell back to generic questions")
+        return {"type": "questions", **result.dict()}
+    
+    data = EvaluationRequest(
+        startup=row["startup"],
+        questions=row["questions"],
+        answers=row["answers"],
+        enhance_with_groq=row["enhance_with_groq"]
+    )
+    try:
+        validate_evaluation_request(data)
+    except HTTPException as e:
+        raise ValueError(e.detail)
+    result = await run_evaluation_pipeline(data)
+    if evaluation_failed(result):
+        raise RuntimeError(f"Evaluation failed ({result.method_used}): {result.evaluation[:200]}")
+    return {"type": "evaluation", **result.dict()}
+
+async def run_evaluation_job(request: dict, on_event: EventCallback) -> dict:
+    """Job runner for queued evaluations"""
+    result = await run_evaluation_pipeline(EvaluationRequest(**request), on_event, stream_tokens=True)
+    return result.dict()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the application"""
     logger.info("Starting AI Startup Evaluation System...")
     
-    # Test Groq setup
-    groq_status = test_groq_setup()
+    # Start the model executor so blocking work never runs on the event loop
+    get_model_executor()
+    
+    # Load and warm up models in the background so the first request doesn't pay for it
+    global preload_task
+    if PRELOAD_MODELS:
+        preload_task = asyncio.create_task(get_model_executor().run(preload_models))
+    
+    # Test Groq setup, then keep re-checking in the background
+    groq_status = await groq_monitor.refresh()
+    groq_monitor.start()
     logger.info(f"Groq status: {groq_status}")
     
+    # Start job workers, resuming anything a previous process left unfinished
+    global job_manager
+    job_manager = JobManager(JobStore(), {"evaluate": run_evaluation_job})
+    await job_manager.start()
+    
     if groq_status.get("groq_configured"):
         logger.info("✅ Groq client is ready!")
     else:
@@ -97,202 +744,398 @@ async def startup_event():
     
     logger.info("🚀 Application startup complete!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background checks, job workers, batches, executors and Groq connections on shutdown"""
+    await groq_monitor.stop()
+    if job_manager is not None:
+        await job_manager.stop()
+    # Batch journals keep finished rows; interrupted batches can be resumed
+    for task in _batch_tasks.values():
+        task.cancel()
+    await asyncio.gather(*_batch_tasks.values(), return_exceptions=True)
+    shutdown_executors()
+    await close_groq_client()
+
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (cached state only, never calls upstream services)"""
     model_info = get_model_info()
-    groq_status = test_groq_setup()
     
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "models": model_info,
-        "groq": groq_status
+        "groq": groq_monitor.snapshot(),
+        "executors": get_executor_stats()
     }
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and the event loop is responsive"""
+    return {"status": "alive", "timestamp": datetime.now().isoformat()}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: the server can accept inference work
+
+    Not ready (503) while models are still preloading or the model queue is
+    full. A failed preload or Groq problems only mark the service as degraded:
+    models are loaded again on demand, and every pipeline falls back to the
+    local model.
+    """
+    model_stats = get_model_executor().stats()
+    groq_status = groq_monitor.snapshot()
+    load_states = get_load_states()
+    
+    model_queue_full = model_stats["active"] + model_stats["queued"] >= model_stats["max_workers"] + model_stats["max_queue"]
+    preloading = preload_task is not None and not preload_task.done()
+    preload_failed = any(state["status"] == "failed" for state in load_states.values())
+    if model_queue_full or preloading:
+        status = "not_ready"
+    elif preload_failed or groq_status.get("status") != "ready":
+        status = "degraded"
+    else:
+        status = "ready"
+    
+    return JSONResponse(
+        status_code=503 if status == "not_ready" else 200,
+        content={
+            "status": status,
+            "timestamp": datetime.now().isoformat(),
+            "model_executor": model_stats,
+            "models": load_states,
+            "groq": groq_status
+        }
+    )
+
 @app.post("/generate-questions", response_model=QuestionResponse)
 async def generate_questions(data: StartupInfo):
     """Generate questions for startup evaluation"""
-    start_time = datetime.now()
-    
     try:
         # Validate input
         is_valid, error_msg = validate_startup_data(data.dict())
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
         
-        logger.info(f"Generating questions for startup: {data.name}")
+        return await run_question_pipeline(data)
         
-        # Step 1: Generate questions using fine-tuned model
-        prompt = build_question_prompt(data.dict())
-        model = get_question_model()
-        raw_output = generate_response(model, prompt, max_new_tokens=1024, temperature=0.7)
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        logger.warning(f"Rejecting question generation: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Server busy, please retry: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error generating questions: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate questions: {str(e)}")
+
+@app.post("/evaluate-startup", response_model=EvaluationResponse)
+async def evaluate_startup(data: EvaluationRequest):
+    """Evaluate startup using hybrid approach"""
+    try:
+        # Validate input
+        validate_evaluation_request(data)
         
-        # Parse questions from raw output
-        raw_questions = parse_questions_from_response(raw_output)
+        return await run_evaluation_pipeline(data)
         
-        logger.info(f"Fine-tuned model generated {len(raw_questions)} questions")
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        logger.warning(f"Rejecting evaluation: {str(e)}")
+        raise HTTPException(status_code=503, detail=f"Server busy, please retry: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error evaluating startup: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to evaluate startup: {str(e)}")
+
+async def question_event_stream(data: StartupInfo):
+    """Yield SSE events while generating and enhancing questions"""
+    start_time = datetime.now()
+    startup = data.dict()
+    
+    try:
+        # Step 1: Stream tokens from the fine-tuned model
+        yield sse_event("stage", {"stage": "fine_tuned", "message": "Fine-tuned model generating questions..."})
         
-        # Step 2: Enhance with Groq (optional fallback)
-        final_questions = raw_questions
-        method_used = "fine_tuned_only"
+        streamer, future, cancel = submit_stream(QUESTION_ADAPTER_NAME, question_prompt_segments(startup), 1024, 0.7)
+        try:
+            async for text in iterate_stream(streamer):
+                yield sse_event("token", {"stage": "fine_tuned", "text": text})
+            
+            raw_output = await asyncio.wrap_future(future)
+        finally:
+            # No-op once finished; otherwise the client went away or the stream timed out
+            cancel.set()
+        raw_questions = parse_questions_from_response(raw_output)
+        logger.info(f"Fine-tuned model streamed {len(raw_questions)} questions")
+        
+        # Step 2: Stream Groq's enhanced questions
+        yield sse_event("stage", {"stage": "groq", "message": "Groq enhancing questions..."})
         
+        enhanced_output = None
         try:
             groq_client = get_groq_client()
-            enhancement_prompt = build_groq_question_enhancement_prompt(data.dict(), raw_questions)
-            enhanced_output = groq_client.enhance_questions(enhancement_prompt)
-            
-            if not enhanced_output.startswith("Error:"):
-                enhanced_questions = parse_questions_from_response(enhanced_output)
-                if len(enhanced_questions) >= 8:  # Ensure we got good questions
-                    final_questions = enhanced_questions[:10]
-                    method_used = "fine_tuned_plus_groq_enhanced"
-                    logger.info("Questions enhanced with Groq successfully")
-                else:
-                    logger.warning("Groq enhancement didn't produce enough questions, using original")
-            else:
-                logger.warning(f"Groq enhancement failed: {enhanced_output}")
-                
+            enhancement_prompt = build_groq_question_enhancement_prompt(startup, raw_questions)
+            chunks = []
+            async for text in groq_client.stream_questions(enhancement_prompt):
+                chunks.append(text)
+                yield sse_event("token", {"stage": "groq", "text": text})
+            enhanced_output = "".join(chunks).strip()
+            if len(enhanced_output) <= 50:
+                enhanced_output = "Error: Groq returned insufficient content"
         except Exception as e:
             logger.warning(f"Groq enhancement failed, using fine-tuned only: {str(e)}")
         
-        # Ensure we have exactly 10 questions
-        if len(final_questions) < 10:
-            # Pad with generic questions if needed
-            generic_questions = [
-                "What is your customer acquisition strategy?",
-                "How do you plan to achieve profitability?",
-                "What are your biggest risks and how do you mitigate them?"
-            ]
-            while len(final_questions) < 10 and generic_questions:
-                final_questions.append(generic_questions.pop(0))
-        
-        final_questions = final_questions[:10]  # Ensure exactly 10
-        
+        final_questions, method_used = select_final_questions(raw_questions, enhanced_output)
         processing_time = (datetime.now() - start_time).total_seconds()
         
-        logger.info(f"Questions generated successfully in {processing_time:.2f} seconds")
-        
-        return QuestionResponse(
+        result = QuestionResponse(
             questions=final_questions,
             raw_questions=raw_questions if method_used.endswith("enhanced") else None,
             count=len(final_questions),
             method_used=method_used,
             processing_time=processing_time
         )
+        yield sse_event("done", result.dict())
         
+    except QueueFullError as e:
+        logger.warning(f"Rejecting streamed question generation: {str(e)}")
+        yield sse_event("error", {"status_code": 503, "detail": f"Server busy, please retry: {str(e)}"})
     except Exception as e:
-        logger.error(f"Error generating questions: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate questions: {str(e)}")
+        logger.error(f"Error streaming questions: {str(e)}")
+        yield sse_event("error", {"status_code": 500, "detail": f"Failed to generate questions: {str(e)}"})
 
-@app.post("/evaluate-startup", response_model=EvaluationResponse)
-async def evaluate_startup(data: EvaluationRequest):
-    """Evaluate startup using hybrid approach"""
-    start_time = datetime.now()
+@app.post("/generate-questions/stream")
+async def generate_questions_stream(data: StartupInfo):
+    """Stream question generation as server-sent events
+
+    Emits ``stage`` and ``token`` events while the fine-tuned model and Groq
+    generate, then a ``done`` event carrying a QuestionResponse (or ``error``).
+    """
+    is_valid, error_msg = validate_startup_data(data.dict())
+    if not is_valid:
+        raise HTTPException(status_code=400, detail=error_msg)
+    
+    logger.info(f"Streaming questions for startup: {data.name}")
+    return StreamingResponse(question_event_stream(data), media_type="text/event-stream")
+
+async def evaluation_event_stream(data: EvaluationRequest):
+    """Yield SSE events while the evaluation pipeline runs"""
+    events = asyncio.Queue()
+    task = asyncio.create_task(run_evaluation_pipeline(
+        data, lambda event, payload: events.put_nowait((event, payload)), stream_tokens=True
+    ))
+    task.add_done_callback(lambda _: events.put_nowait(None))
     
     try:
-        # Validate input
-        is_valid, error_msg = validate_startup_data(data.startup.dict())
-        if not is_valid:
-            raise HTTPException(status_code=400, detail=error_msg)
-        
-        if len(data.questions) != len(data.answers):
-            raise HTTPException(status_code=400, detail="Number of questions and answers must match")
+        while True:
+            item = await events.get()
+            if item is None:
+                break
+            yield sse_event(*item)
         
-        if len(data.questions) < 5:
-            raise HTTPException(status_code=400, detail="At least 5 questions required for evaluation")
+        yield sse_event("done", task.result().dict())
         
-        logger.info(f"Evaluating startup: {data.startup.name}")
-        
-        # Step 1: Generate raw evaluation using fine-tuned model
-        eval_prompt = build_evaluation_prompt(data.startup.dict(), data.questions, data.answers)
-        eval_model = get_eval_model()
-        raw_evaluation = generate_response(eval_model, eval_prompt, max_new_tokens=4000, temperature=0.6)
-        
-        logger.info("Raw evaluation generated by fine-tuned model")
+    except QueueFullError as e:
+        logger.warning(f"Rejecting streamed evaluation: {str(e)}")
+        yield sse_event("error", {"status_code": 503, "detail": f"Server busy, please retry: {str(e)}"})
+    except Exception as e:
+        logger.error(f"Error streaming evaluation: {str(e)}")
+        yield sse_event("error", {"status_code": 500, "detail": f"Failed to evaluate startup: {str(e)}"})
+    finally:
+        # Client went away: stop the pipeline
+        if not task.done():
+            task.cancel()
+
+@app.post("/evaluate-startup/stream")
+async def evaluate_startup_stream(data: EvaluationRequest):
+    """Stream a startup evaluation as server-sent events
+
+    Emits ``stage`` and ``token`` events while the fine-tuned model and Groq
+    generate, then a ``done`` event carrying an EvaluationResponse (or ``error``).
+    """
+    validate_evaluation_request(data)
+    
+    logger.info(f"Streaming evaluation for startup: {data.startup.name}")
+    return StreamingResponse(evaluation_event_stream(data), media_type="text/event-stream")
+
+@app.post("/jobs/evaluate", response_model=JobSubmission, status_code=202)
+async def submit_evaluation_job(data: EvaluationRequest):
+    """Queue an evaluation and return its job id immediately"""
+    validate_evaluation_request(data)
+    
+    job = await job_manager.submit("evaluate", data.dict())
+    return JobSubmission(
+        job_id=job["id"],
+        status=job["status"],
+        status_url=f"/jobs/{job['id']}",
+        events_url=f"/jobs/{job['id']}/events"
+    )
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 50, status: Optional[str] = None):
+    """List recent jobs (without request or result payloads)"""
+    jobs = job_manager.store.list(limit=limit, status=status)
+    return {"jobs": jobs, "count": len(jobs), "queued": job_manager.queue_depth()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get a job's status, per-stage progress and (when finished) its result"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+async def job_event_stream(job_id: str):
+    """Yield SSE events for a job until it completes or fails"""
+    queue = job_manager.subscribe(job_id)
+    try:
+        # Read state after subscribing so no transition can be missed
+        job = job_manager.get(job_id)
+        yield sse_event("status", {"status": job["status"], "stage": job["stage"], "progress": job["progress"]})
         
-        # Step 2: Always enhance with Groq (this is the pipeline you requested)
-        final_evaluation = raw_evaluation
-        method_used = "fine_tuned_only"
+        if job["status"] == "completed":
+            yield sse_event("done", job["result"])
+            return
+        if job["status"] == "failed":
+            yield sse_event("error", {"detail": job["error"]})
+            return
+        if job["stage"]:
+            yield sse_event("stage", {"stage": job["stage"], "progress": job["progress"], "message": job["message"]})
         
-        if data.enhance_with_groq:
+        while True:
             try:
-                groq_client = get_groq_client()
-                enhancement_prompt = build_groq_enhancement_prompt(
-                    data.startup.dict(), 
-                    data.questions, 
-                    data.answers, 
-                    raw_evaluation
-                )
-                
-                enhanced_evaluation = groq_client.enhance_evaluation(enhancement_prompt)
-                
-                if not enhanced_evaluation.startswith("Error:"):
-                    final_evaluation = enhanced_evaluation
-                    method_used = "fine_tuned_plus_groq_enhanced"
-                    logger.info("Evaluation enhanced with Groq successfully")
-                else:
-                    logger.warning(f"Groq enhancement failed: {enhanced_evaluation}")
-                    final_evaluation = f"ORIGINAL MODEL EVALUATION:\n\n{raw_evaluation}\n\nNOTE: Groq enhancement failed - {enhanced_evaluation}"
-                    
-            except Exception as e:
-                logger.warning(f"Groq enhancement failed: {str(e)}")
-                final_evaluation = f"ORIGINAL MODEL EVALUATION:\n\n{raw_evaluation}\n\nNOTE: Groq enhancement failed due to: {str(e)}"
-                method_used = "fine_tuned_with_groq_error"
-        
-        # Format the final evaluation
-        final_evaluation = format_evaluation_response(final_evaluation)
-        
-        processing_time = (datetime.now() - start_time).total_seconds()
-        
-        # Cache the result
-        cache_key = f"{data.startup.name}_{hash(str(data.questions))}"
-        startup_evaluations[cache_key] = {
-            "result": final_evaluation,
-            "timestamp": datetime.now(),
-            "method": method_used
-        }
-        
-        logger.info(f"Evaluation completed successfully in {processing_time:.2f} seconds using {method_used}")
-        
-        return EvaluationResponse(
-            evaluation=final_evaluation,
-            raw_evaluation=raw_evaluation if method_used.endswith("enhanced") else None,
-            questions_used=data.questions,
-            method_used=method_used,
-            processing_time=processing_time,
-            timestamp=datetime.now().isoformat()
-        )
-        
-    except Exception as e:
-        logger.error(f"Error evaluating startup: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Failed to evaluate startup: {str(e)}")
+                event, payload = await asyncio.wait_for(queue.get(), timeout=JOB_EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            
+            yield sse_event(event, payload)
+            if event in ("done", "error"):
+                break
+    finally:
+        job_manager.unsubscribe(job_id, queue)
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """Subscribe to a job's stage, token and completion events (SSE)"""
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return StreamingResponse(job_event_stream(job_id), media_type="text/event-stream")
+
+def start_batch_run(batch_id: str, input_path: str, output_path: str, concurrency: int) -> BatchRun:
+    """Load a batch input file and start processing it in the background"""
+    batch_run = BatchRun(load_rows(input_path), output_path, process_batch_row, concurrency=concurrency)
+    batch_runs[batch_id] = batch_run
+    
+    async def run():
+        try:
+            await batch_run.run()
+        except Exception as e:
+            logger.error(f"Batch {batch_id} failed: {str(e)}")
+            batch_run.status = "failed"
+    
+    _batch_tasks[batch_id] = asyncio.create_task(run())
+    return batch_run
+
+@app.post("/batch/evaluate", status_code=202)
+async def submit_batch_evaluation(
+    file: UploadFile = File(...),
+    concurrency: int = Form(BATCH_CONCURRENCY),
+    output_format: str = Form("jsonl")
+):
+    """Evaluate every row of an uploaded CSV/JSONL file in the background"""
+    if output_format not in ("jsonl", "parquet"):
+        raise HTTPException(status_code=400, detail="output_format must be 'jsonl' or 'parquet'")
+    if concurrency < 1:
+        raise HTTPException(status_code=400, detail="concurrency must be at least 1")
+    if output_format == "parquet":
+        try:
+            check_parquet_support()
+        except RuntimeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    batch_id = uuid.uuid4().hex
+    batch_dir = os.path.join(BATCH_DIR, batch_id)
+    os.makedirs(batch_dir, exist_ok=True)
+    
+    extension = ".csv" if (file.filename or "").lower().endswith(".csv") else ".jsonl"
+    input_path = os.path.join(batch_dir, f"input{extension}")
+    output_path = os.path.join(batch_dir, f"results.{output_format}")
+    with open(input_path, "wb") as f:
+        f.write(await file.read())
+    with open(os.path.join(batch_dir, "batch.json"), "w", encoding="utf-8") as f:
+        json.dump({"input_path": input_path, "output_path": output_path, "concurrency": concurrency}, f)
+    
+    try:
+        batch_run = start_batch_run(batch_id, input_path, output_path, concurrency)
+    except (ValueError, KeyError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read batch file: {str(e)}")
+    
+    logger.info(f"Started batch {batch_id} with {batch_run.total} rows")
+    return {"batch_id": batch_id, "total": batch_run.total, "status_url": f"/batch/{batch_id}"}
+
+@app.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str):
+    """Get progress of a batch run"""
+    batch_run = batch_runs.get(batch_id)
+    if batch_run is None:
+        if os.path.exists(os.path.join(BATCH_DIR, batch_id, "batch.json")):
+            return {"batch_id": batch_id, "status": "interrupted", "resume_url": f"/batch/{batch_id}/resume"}
+        raise HTTPException(status_code=404, detail=f"Batch not found: {batch_id}")
+    return {"batch_id": batch_id, **batch_run.progress()}
+
+@app.post("/batch/{batch_id}/resume", status_code=202)
+async def resume_batch_evaluation(batch_id: str):
+    """Resume a batch, skipping rows that already completed"""
+    metadata_path = os.path.join(BATCH_DIR, batch_id, "batch.json")
+    if not os.path.exists(metadata_path):
+        raise HTTPException(status_code=404, detail=f"Batch not found: {batch_id}")
+    
+    batch_run = batch_runs.get(batch_id)
+    if batch_run is not None and batch_run.status == "running":
+        raise HTTPException(status_code=409, detail="Batch is already running")
+    
+    with open(metadata_path, encoding="utf-8") as f:
+        metadata = json.load(f)
+    try:
+        batch_run = start_batch_run(batch_id, metadata["input_path"], metadata["output_path"], metadata["concurrency"])
+    except RuntimeError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"batch_id": batch_id, "total": batch_run.total, "status_url": f"/batch/{batch_id}"}
+
+@app.get("/batch/{batch_id}/results")
+async def download_batch_results(batch_id: str):
+    """Download the results file of a batch (partial while it is running)"""
+    batch_run = batch_runs.get(batch_id)
+    if batch_run is None:
+        raise HTTPException(status_code=404, detail=f"Batch not found: {batch_id}")
+    path = batch_run.output_path if os.path.exists(batch_run.output_path) else batch_run.journal_path
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="No results written yet")
+    return FileResponse(path, filename=os.path.basename(path))
 
 @app.get("/cached-evaluations")
 async def get_cached_evaluations():
     """Get list of cached evaluations"""
-    cached = []
-    for key, value in startup_evaluations.items():
-        cached.append({
-            "key": key,
-            "timestamp": value["timestamp"].isoformat(),
-            "method": value["method"]
-        })
-    return {"cached_evaluations": cached, "count": len(cached)}
+    cache = get_evaluation_cache()
+    cached = cache.entries()
+    return {"cached_evaluations": cached, "count": len(cached), "stats": cache.stats()}
 
 @app.delete("/cached-evaluations")
 async def clear_cached_evaluations():
     """Clear all cached evaluations"""
-    count = len(startup_evaluations)
-    startup_evaluations.clear()
+    count = get_evaluation_cache().clear()
     return {"message": f"Cleared {count} cached evaluations"}
 
 @app.post("/test-groq")
 async def test_groq():
     """Test Groq API connection"""
     try:
-        groq_client = get_groq_client()
-        test_result = groq_client.test_connection()
+        # An explicit test also refreshes the cached health state
+        groq_status = await groq_monitor.refresh()
+        if not groq_status.get("groq_configured"):
+            return {"status": "error", "message": f"Groq test error: {groq_status.get('error')}"}
+        test_result = groq_status.get("connection_test", False)
         
         if test_result:
             return {"status": "success", "message": "Groq API is working correctly"}
@@ -302,16 +1145,35 @@ async def test_groq():
     except Exception as e:
         return {"status": "error", "message": f"Groq test error: {str(e)}"}
 
+@app.get("/groq/budget")
+async def get_groq_budget():
+    """Get client-side Groq request/token budget usage"""
+    try:
+        return {"status": "ok", "budget": get_groq_client().get_budget_usage()}
+    except Exception as e:
+        return {"status": "error", "message": f"Groq not configured: {str(e)}"}
+
 @app.post("/cleanup")
-async def cleanup_system():
-    """Clean up GPU memory and cached data"""
+async def cleanup_system(full: bool = False):
+    """Release idle adapters, or with ``full`` drop every model and the evaluation cache
+
+    Adapters are otherwise evicted automatically under MODEL_MEMORY_BUDGET_MB,
+    so a full cleanup is only needed to hand the GPU to another process.
+    """
     try:
-        # Clear model cache
-        cleanup_models()
+        # Runs on the model worker so it can't race a generation
+        if not full:
+            evicted = await get_model_executor().run(release_idle_models)
+            return {
+                "message": "Idle adapters released",
+                "evicted_adapters": evicted,
+                "residency": get_model_info()["residency"]
+            }
+        
+        await get_model_executor().run(cleanup_models)
         
         # Clear evaluation cache
-        eval_count = len(startup_evaluations)
-        startup_evaluations.clear()
+        eval_count = get_evaluation_cache().clear()
         
         return {
             "message": "System cleanup completed",
@@ -327,18 +1189,29 @@ async def cleanup_system():
 async def get_system_info():
     """Get comprehensive system information"""
     model_info = get_model_info()
-    groq_status = test_groq_setup()
     
     return {
         "timestamp": datetime.now().isoformat(),
         "models": model_info,
-        "groq": groq_status,
-        "cached_evaluations": len(startup_evaluations),
+        "groq": groq_monitor.snapshot(),
+        "executors": get_executor_stats(),
+        "batching": get_batch_scheduler().stats(),
+        "routing": router.stats(),
+        "cached_evaluations": get_evaluation_cache().stats(),
         "available_endpoints": [
             "/generate-questions",
             "/evaluate-startup", 
+            "/generate-questions/stream",
+            "/evaluate-startup/stream",
+            "/jobs/evaluate",
+            "/batch/evaluate",
+            "/jobs/{job_id}",
+            "/jobs/{job_id}/events",
             "/health",
+            "/health/live",
+            "/health/ready",
             "/test-groq",
+            "/groq/budget",
             "/cleanup",
             "/system-info",
             "/cached-evaluations"
@@ -1,8 +1,39 @@
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+import transformers
+from packaging import version
+from transformers import (
+    AutoConfig,
+    AutoModelForCausalLM,
+    AutoTokenizer,
+    BitsAndBytesConfig,
+    LogitsProcessorList,
+    PretrainedConfig,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
 from peft import PeftModel
 import os
+import json
 import logging
+import threading
+import time
+from functools import lru_cache
+from queue import Queue
+from typing import Dict, List, Optional, Tuple
+
+from constrained import NumberedQuestionsLogitsProcessor, numbered_questions_gbnf, numbered_questions_regex
+from model_residency import ResidencyManager
+from stopping import (
+    CancelStoppingCriteria,
+    StopRule,
+    TextStoppingCriteria,
+    after_numbered_items,
+    after_overall_assessment,
+    find_stop,
+    on_stop_strings,
+    truncate_at_stop,
+)
+from prompt import Prompt, Segment, join_segments, question_prompt_segments, evaluation_prompt_segments
 
 logger = logging.getLogger(__name__)
 
@@ -11,10 +42,110 @@ QUESTION_ADAPTER = "saimqureshi656/startups-question-generation"
 EVAL_ADAPTER = "saimqureshi656/llama3-8b-startup-evaluator-lora"
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 
-# Global variables to cache models
+# The Rust tokenizer is much faster on long evaluation prompts; on load it is
+# compared against the slow tokenizer and replaced by it if they disagree.
+USE_FAST_TOKENIZER = os.getenv("USE_FAST_TOKENIZER", "1") == "1"
+TOKENIZER_PARITY_CHECK = os.getenv("TOKENIZER_PARITY_CHECK", "1") == "1"
+
+# Local artifacts written by export_models.py (base/, adapters/<name>/). When
+# set, weights are memory-mapped from local safetensors and the hub is never contacted.
+MODEL_ARTIFACTS_DIR = os.getenv("MODEL_ARTIFACTS_DIR", "")
+
+# Which engine runs generation: "hf" (transformers + PEFT, in process),
+# "vllm" (OpenAI-compatible vLLM server with multi-LoRA) or "llamacpp" (GGUF on CPU)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "hf").lower()
+
+VLLM_BASE_URL = os.getenv("VLLM_BASE_URL", "http://localhost:8001/v1")
+VLLM_API_KEY = os.getenv("VLLM_API_KEY", "")
+VLLM_TIMEOUT = float(os.getenv("VLLM_TIMEOUT", "300"))
+
+# One merged GGUF file per adapter: <LLAMACPP_MODEL_DIR>/<adapter_name>.gguf
+LLAMACPP_MODEL_DIR = os.getenv("LLAMACPP_MODEL_DIR", "models/gguf")
+LLAMACPP_N_CTX = int(os.getenv("LLAMACPP_N_CTX", "8192"))
+LLAMACPP_THREADS = int(os.getenv("LLAMACPP_THREADS", str(os.cpu_count() or 4)))
+
+# Load models in the background on startup, then run a short generation per
+# adapter so CUDA kernels are compiled before the first real request
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "1") == "1"
+WARMUP_MAX_NEW_TOKENS = int(os.getenv("WARMUP_MAX_NEW_TOKENS", "8"))
+
+# Reuse past-key-values of the static prompt preamble instead of prefilling it
+PREFIX_CACHE_ENABLED = os.getenv("PREFIX_CACHE_ENABLED", "1") == "1"
+
+# Stop generating once the output is structurally complete instead of running to
+# EOS or max_new_tokens: after the Nth numbered question (0 disables), after the
+# "Overall Assessment" paragraph, or on any of the JSON-encoded STOP_STRINGS
+STOP_AFTER_QUESTIONS = int(os.getenv("STOP_AFTER_QUESTIONS", "10"))
+STOP_AFTER_ASSESSMENT = os.getenv("STOP_AFTER_ASSESSMENT", "1") == "1"
+STOP_STRINGS = json.loads(os.getenv("STOP_STRINGS", "[]"))
+
+# Constrain the question adapter to exactly 10 numbered lines ending in "?", so
+# no generation is wasted on unparseable output (disables speculative decoding for it)
+CONSTRAINED_QUESTIONS = os.getenv("CONSTRAINED_QUESTIONS", "0") == "1"
+
+# Speculative decoding per endpoint: "off", "prompt_lookup" (n-gram drafts taken
+# from the prompt, which evaluations echo heavily) or "draft" (a small model
+# sharing the Llama 3 tokenizer proposes tokens that the adapter verifies)
+SPECULATIVE_MODES_AVAILABLE = ("off", "prompt_lookup", "draft")
+DRAFT_MODEL = os.getenv("DRAFT_MODEL", "meta-llama/Llama-3.2-1B")
+PROMPT_LOOKUP_TOKENS = int(os.getenv("PROMPT_LOOKUP_TOKENS", "10"))
+
+QUESTION_ADAPTER_NAME = "question"
+EVAL_ADAPTER_NAME = "eval"
+
+ADAPTERS = {
+    QUESTION_ADAPTER_NAME: QUESTION_ADAPTER,
+    EVAL_ADAPTER_NAME: EVAL_ADAPTER,
+}
+
+# Each endpoint uses one adapter, so the speculative mode is chosen per adapter
+SPECULATIVE_MODES = {
+    QUESTION_ADAPTER_NAME: os.getenv("SPECULATIVE_QUESTIONS", "off").strip().lower(),
+    EVAL_ADAPTER_NAME: os.getenv("SPECULATIVE_EVALUATION", "off").strip().lower(),
+}
+# Fail at startup on a typo rather than on every generation for that adapter
+for _adapter_name, _mode in SPECULATIVE_MODES.items():
+    if _mode not in SPECULATIVE_MODES_AVAILABLE:
+        raise ValueError(
+            f"Unknown speculative decoding mode for the {_adapter_name} adapter: {_mode!r} "
+            f"(expected one of {', '.join(SPECULATIVE_MODES_AVAILABLE)})"
+        )
+
+# Global variables to cache models. A single quantized base is shared by both
+# LoRA adapters, which are attached to one PeftModel under their own names.
 _tokenizer = None
-_question_model = None
-_eval_model = None
+_base_model = None
+_peft_model = None
+_model_lock = threading.RLock()
+_segment_cache_enabled = False
+_tokenizer_status = {}
+
+# (adapter_name, prefix token ids) -> past_key_values in the legacy tuple format,
+# which generate() never mutates, so one entry can be shared by every request
+_prefix_cache = {}
+_prefix_stats = {"hits": 0, "misses": 0}
+
+_draft_model = None
+_draft_model_error = None
+_speculative_stats = {mode: 0 for mode in SPECULATIVE_MODES_AVAILABLE}
+
+SAMPLE_STARTUP = {
+    "name": "Acme Robotics Inc.",
+    "industry": "Logistics / Robotics",
+    "pitch": "Autonomous forklifts for mid-size warehouses, cutting labor costs by 40%!",
+    "founded_year": "2021",
+    "funding": "$2.5M seed (Q3 2022)",
+}
+SAMPLE_QUESTIONS = [f"What is your plan for milestone #{i + 1} in 2024?" for i in range(10)]
+SAMPLE_ANSWERS = [f"We expect ~{(i + 1) * 10}% growth, driven by pilots." for i in range(10)]
+
+def _parity_prompts() -> List[List[Segment]]:
+    return [
+        question_prompt_segments(SAMPLE_STARTUP),
+        evaluation_prompt_segments(SAMPLE_STARTUP, SAMPLE_QUESTIONS, SAMPLE_ANSWERS),
+        # Five questions (the minimum) leave the industry-specific group empty
+        evaluation_prompt_segments(SAMPLE_STARTUP, SAMPLE_QUESTIONS[:5], SAMPLE_ANSWERS[:5]),
+    ]
 
 def get_bnb_config():
     return BitsAndBytesConfig(
@@ -24,64 +155,363 @@ def get_bnb_config():
         bnb_4bit_compute_dtype=torch.float16,
     )
 
+def base_model_source() -> Tuple[str, dict]:
+    """Where to load the base model and tokenizer from, with the matching from_pretrained kwargs"""
+    if MODEL_ARTIFACTS_DIR:
+        return os.path.join(MODEL_ARTIFACTS_DIR, "base"), {"local_files_only": True}
+    return BASE_MODEL, {"use_auth_token": True}
+
+def adapter_source(adapter_name: str) -> str:
+    """Local export directory or hub repo of a LoRA adapter"""
+    if MODEL_ARTIFACTS_DIR:
+        return os.path.join(MODEL_ARTIFACTS_DIR, "adapters", adapter_name)
+    return ADAPTERS[adapter_name]
+
+def _load_tokenizer(use_fast: bool):
+    source, kwargs = base_model_source()
+    tokenizer = AutoTokenizer.from_pretrained(
+        source, 
+        use_fast=use_fast,
+        **kwargs
+    )
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    # Decoder-only models need left padding for batched generation
+    tokenizer.padding_side = "left"
+    return tokenizer
+
+def check_tokenizer_parity(fast_tokenizer, texts: List[str]) -> bool:
+    """Check that the fast tokenizer produces the same ids as the slow one"""
+    try:
+        slow_tokenizer = _load_tokenizer(use_fast=False)
+    except Exception as e:
+        logger.warning(f"Slow tokenizer unavailable, skipping parity check: {e}")
+        return True
+    
+    for text in texts:
+        if fast_tokenizer(text).input_ids != slow_tokenizer(text).input_ids:
+            logger.warning("Fast and slow tokenizers disagree on a sample prompt")
+            return False
+    return True
+
 def get_tokenizer():
-    global _tokenizer
-    if _tokenizer is None:
-        logger.info("Loading tokenizer...")
-        _tokenizer = AutoTokenizer.from_pretrained(
-            BASE_MODEL, 
-            use_auth_token=True, 
-            use_fast=False
-        )
-        if _tokenizer.pad_token is None:
-            _tokenizer.pad_token = _tokenizer.eos_token
-        logger.info("Tokenizer loaded successfully!")
+    global _tokenizer, _segment_cache_enabled
+    with _model_lock:
+        if _tokenizer is None:
+            logger.info(f"Loading tokenizer (use_fast={USE_FAST_TOKENIZER})...")
+            tokenizer = _load_tokenizer(USE_FAST_TOKENIZER)
+            samples = [join_segments(segments) for segments in _parity_prompts()]
+            
+            parity = None
+            if tokenizer.is_fast and TOKENIZER_PARITY_CHECK:
+                parity = check_tokenizer_parity(tokenizer, samples)
+                if not parity:
+                    logger.warning("Falling back to the slow tokenizer")
+                    tokenizer = _load_tokenizer(use_fast=False)
+            _tokenizer = tokenizer
+            
+            # Only reuse cached segment ids if they reproduce full-prompt tokenization
+            _encode_static.cache_clear()
+            _segment_cache_enabled = all(
+                not _segments_splittable(segments)
+                or _encode_segments(segments) == tokenizer(join_segments(segments)).input_ids
+                for segments in _parity_prompts()
+            )
+            if not _segment_cache_enabled:
+                logger.warning("Segmented tokenization differs from full prompts; segment cache disabled")
+            
+            _tokenizer_status.update(is_fast=tokenizer.is_fast, parity=parity, segment_cache=_segment_cache_enabled)
+            logger.info("Tokenizer loaded successfully!")
     return _tokenizer
 
+@lru_cache(maxsize=64)
+def _encode_static(text: str, add_special_tokens: bool) -> Tuple[int, ...]:
+    return tuple(_tokenizer(text, add_special_tokens=add_special_tokens).input_ids)
+
+def _segments_splittable(segments: List[Segment]) -> bool:
+    """Whether every segment boundary is one the pre-tokenizer always splits at
+
+    Llama 3's pre-tokenizer joins punctuation with the newlines after it
+    (":\n\n\n" is one piece), so a segment starting with a newline, like the
+    "\n\n" left by an empty question group, has to be tokenized together
+    with the text before it.
+    """
+    previous = ""
+    for text, _ in segments:
+        if not text:
+            continue
+        if previous and (text[0] in "\r\n" or (previous[-1].isspace() and text[0].isspace())):
+            return False
+        previous = text
+    return True
+
+def _use_segments(prompt: Prompt) -> bool:
+    return not isinstance(prompt, str) and _segment_cache_enabled and _segments_splittable(prompt)
+
+def _encode_segments(segments: List[Segment]) -> List[int]:
+    ids = []
+    for index, (text, is_static) in enumerate(segments):
+        # Special tokens (BOS) are added once, in front of the first segment
+        add_special_tokens = index == 0
+        if is_static:
+            ids.extend(_encode_static(text, add_special_tokens))
+        else:
+            ids.extend(_tokenizer(text, add_special_tokens=add_special_tokens).input_ids)
+    return ids
+
+def encode_prompts(prompts: List[Prompt]):
+    """Tokenize prompts into a left-padded batch, reusing cached ids of static segments"""
+    tokenizer = get_tokenizer()
+    if all(isinstance(prompt, str) for prompt in prompts):
+        return tokenizer(prompts, return_tensors="pt", padding=True)
+    
+    input_ids = [
+        _encode_segments(prompt) if _use_segments(prompt)
+        else tokenizer(prompt if isinstance(prompt, str) else join_segments(prompt)).input_ids
+        for prompt in prompts
+    ]
+    return tokenizer.pad({"input_ids": input_ids}, return_tensors="pt")
+
+def get_base_model():
+    """Load the shared 4-bit base model once"""
+    global _base_model
+    with _model_lock:
+        if _base_model is None:
+            get_tokenizer()  # Ensure tokenizer is loaded
+
+            source, kwargs = base_model_source()
+            logger.info(f"Loading shared base model from {source}...")
+            _base_model = AutoModelForCausalLM.from_pretrained(
+                source,
+                quantization_config=get_bnb_config(),
+                device_map="auto",
+                torch_dtype=torch.float16,
+                trust_remote_code=True,
+                **kwargs
+            )
+            _hf_residency.admit("base_model", _base_model.get_memory_footprint(), DEVICE, pinned=True)
+            logger.info("Base model loaded successfully!")
+    return _base_model
+
+def load_adapter(adapter_name: str):
+    """Attach a LoRA adapter to the shared base model and return the PeftModel"""
+    global _peft_model
+    if adapter_name not in ADAPTERS:
+        raise ValueError(f"Unknown adapter: {adapter_name}")
+
+    with _model_lock:
+        if _peft_model is None:
+            logger.info(f"Loading {adapter_name} adapter...")
+            _peft_model = PeftModel.from_pretrained(
+                get_base_model(),
+                adapter_source(adapter_name),
+                adapter_name=adapter_name
+            )
+            logger.info(f"{adapter_name.capitalize()} adapter loaded successfully!")
+            _hf_residency.admit(adapter_name, _adapter_bytes(adapter_name), DEVICE)
+        elif adapter_name not in _peft_model.peft_config:
+            logger.info(f"Loading {adapter_name} adapter...")
+            _peft_model.load_adapter(adapter_source(adapter_name), adapter_name=adapter_name)
+            logger.info(f"{adapter_name.capitalize()} adapter loaded successfully!")
+            _hf_residency.admit(adapter_name, _adapter_bytes(adapter_name), DEVICE)
+    return _peft_model
+
+def _adapter_bytes(adapter_name: str) -> int:
+    return sum(
+        param.numel() * param.element_size()
+        for name, param in _peft_model.named_parameters()
+        if f".{adapter_name}." in name
+    )
+
+def _evict_hf_adapter(adapter_name: str):
+    """Remove one LoRA adapter from the shared PeftModel (called with ``_model_lock`` held)"""
+    _peft_model.base_model.delete_adapter(adapter_name)
+    for key in [key for key in _prefix_cache if key[0] == adapter_name]:
+        del _prefix_cache[key]
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+# Tracks the base model (pinned) and each adapter; adapters are evicted LRU over MODEL_MEMORY_BUDGET_MB
+_hf_residency = ResidencyManager(_evict_hf_adapter)
+
 def get_question_model():
-    global _question_model
-    if _question_model is None:
-        logger.info("Loading question generation model...")
-        tokenizer = get_tokenizer()  # Ensure tokenizer is loaded
-        
-        base_model = AutoModelForCausalLM.from_pretrained(
-            BASE_MODEL,
-            quantization_config=get_bnb_config(),
-            device_map="auto",
-            torch_dtype=torch.float16,
-            trust_remote_code=True
-        )
-        _question_model = PeftModel.from_pretrained(base_model, QUESTION_ADAPTER)
-        logger.info("Question model loaded successfully!")
-    return _question_model
+    return load_adapter(QUESTION_ADAPTER_NAME)
 
 def get_eval_model():
-    global _eval_model
-    if _eval_model is None:
-        logger.info("Loading evaluation model...")
-        tokenizer = get_tokenizer()  # Ensure tokenizer is loaded
-        
-        base_model = AutoModelForCausalLM.from_pretrained(
-            BASE_MODEL,
-            quantization_config=get_bnb_config(),
-            device_map="auto",
-            torch_dtype=torch.float16,
-            trust_remote_code=True
+    return load_adapter(EVAL_ADAPTER_NAME)
+
+def _loaded_adapters():
+    if _peft_model is None:
+        return []
+    return list(_peft_model.peft_config.keys())
+
+def _static_prefix(prompts: List[Prompt]) -> Optional[Tuple[int, ...]]:
+    """Token ids of the leading static segment when its KV cache can be reused
+
+    Only a prompt's leading segment can be reused: attention is causal, so the
+    cached keys/values of a static segment that follows request-specific text
+    (like the question prompt's instruction tail) would be different for every
+    request. Batches are left-padded to different offsets, so only single
+    prompts use the cache.
+    """
+    if not PREFIX_CACHE_ENABLED or len(prompts) != 1:
+        return None
+    prompt = prompts[0]
+    if not _use_segments(prompt) or not prompt[0][1]:
+        return None
+    return _encode_static(prompt[0][0], True)
+
+def _prefix_past_key_values(model, adapter_name: str, prefix_ids: Tuple[int, ...]):
+    """Get (computing on first use) the past-key-values of a prompt prefix for ``adapter_name``
+
+    Must be called with ``_model_lock`` held and ``adapter_name`` active.
+    """
+    key = (adapter_name, prefix_ids)
+    past_key_values = _prefix_cache.get(key)
+    if past_key_values is not None:
+        _prefix_stats["hits"] += 1
+        return past_key_values
+    
+    _prefix_stats["misses"] += 1
+    outputs = model(input_ids=torch.tensor([prefix_ids], device=model.device), use_cache=True)
+    past_key_values = outputs.past_key_values
+    if hasattr(past_key_values, "to_legacy_cache"):
+        past_key_values = past_key_values.to_legacy_cache()
+    _prefix_cache[key] = past_key_values
+    logger.info(f"Cached KV for a {len(prefix_ids)}-token prompt prefix ({adapter_name} adapter)")
+    return past_key_values
+
+def draft_model_config(source: str, **kwargs):
+    """Config of the draft model in a form the pinned transformers accepts
+
+    Llama 3.1/3.2 configs use the "llama3" ``rope_scaling`` format, which
+    transformers<4.43 rejects. That scaling mainly matters past the original
+    8k context, and the adapter verifies every drafted token, so the draft
+    runs with plain RoPE at its original context length; a slightly different
+    draft only lowers the acceptance rate.
+    """
+    config_dict, _ = PretrainedConfig.get_config_dict(source, **kwargs)
+    rope_scaling = config_dict.get("rope_scaling")
+    if rope_scaling and "type" not in rope_scaling:
+        logger.info(f"Draft model uses {rope_scaling.get('rope_type')} rope scaling; loading it with plain RoPE")
+        config_dict.pop("rope_scaling")
+        config_dict["max_position_embeddings"] = rope_scaling.get(
+            "original_max_position_embeddings", config_dict.get("max_position_embeddings")
         )
-        _eval_model = PeftModel.from_pretrained(base_model, EVAL_ADAPTER)
-        logger.info("Evaluation model loaded successfully!")
-    return _eval_model
+    return AutoConfig.for_model(**config_dict)
 
-def generate_response(model, prompt: str, max_new_tokens: int = 1024, temperature: float = 0.7) -> str:
-    """Generate response from model with proper token handling"""
+def get_draft_model():
+    """Load the small draft model used for speculative decoding"""
+    global _draft_model
+    with _model_lock:
+        if _draft_model is None:
+            source, kwargs = (DRAFT_MODEL, {"use_auth_token": True})
+            if MODEL_ARTIFACTS_DIR:
+                source, kwargs = os.path.join(MODEL_ARTIFACTS_DIR, "draft"), {"local_files_only": True}
+            logger.info(f"Loading draft model from {source}...")
+            _draft_model = AutoModelForCausalLM.from_pretrained(
+                source,
+                config=draft_model_config(source, **kwargs),
+                device_map="auto",
+                torch_dtype=torch.float16,
+                **kwargs
+            )
+            _hf_residency.admit("draft_model", _draft_model.get_memory_footprint(), DEVICE, pinned=True)
+    return _draft_model
+
+def _speculative_kwargs(adapter_name: Optional[str], batch_size: int, mode: Optional[str] = None) -> dict:
+    """Extra ``generate`` arguments for the speculative mode of ``adapter_name``
+
+    Assisted generation only supports a batch of one, so batched calls run normally.
+    """
+    mode = mode or SPECULATIVE_MODES.get(adapter_name, "off")
+    if mode not in SPECULATIVE_MODES_AVAILABLE:
+        raise ValueError(f"Unknown speculative decoding mode: {mode}")
+    if mode == "off" or batch_size != 1:
+        return {}
+    
+    if mode == "prompt_lookup":
+        if version.parse(transformers.__version__) < version.parse("4.37.0"):
+            logger.warning(f"Prompt lookup decoding needs transformers>=4.37 (found {transformers.__version__}); generating normally")
+            return {}
+        kwargs = {"prompt_lookup_num_tokens": PROMPT_LOOKUP_TOKENS}
+    else:
+        global _draft_model_error
+        if _draft_model_error is not None:
+            return {}
+        try:
+            kwargs = {"assistant_model": get_draft_model()}
+        except Exception as e:
+            # Don't retry the load on every request; cleanup_models() resets this
+            _draft_model_error = str(e)
+            logger.warning(f"Could not load draft model {DRAFT_MODEL}, generating normally: {_draft_model_error}")
+            return {}
+    _speculative_stats[mode] += 1
+    return kwargs
+
+def constrained_decoding(adapter_name: Optional[str]) -> bool:
+    """Whether ``adapter_name`` generates under the numbered-question grammar"""
+    return CONSTRAINED_QUESTIONS and adapter_name == QUESTION_ADAPTER_NAME
+
+def default_stop_rules(adapter_name: Optional[str]) -> List[StopRule]:
+    """Stop rules configured for the output format of ``adapter_name``"""
+    rules = [on_stop_strings(STOP_STRINGS)] if STOP_STRINGS else []
+    if adapter_name == QUESTION_ADAPTER_NAME and STOP_AFTER_QUESTIONS > 0:
+        rules.append(after_numbered_items(STOP_AFTER_QUESTIONS))
+    elif adapter_name == EVAL_ADAPTER_NAME and STOP_AFTER_ASSESSMENT:
+        rules.append(after_overall_assessment())
+    return rules
+
+def generate_response(model, prompt: Prompt, max_new_tokens: int = 1024, temperature: float = 0.7,
+                      adapter_name: Optional[str] = None) -> str:
+    """Generate response from model with proper token handling
+
+    When ``adapter_name`` is given the shared PeftModel is switched to that
+    adapter for the duration of the call.
+    """
+    return generate_batch(model, [prompt], max_new_tokens, temperature, adapter_name)[0]
+
+def generate_batch(model, prompts: List[Prompt], max_new_tokens: int = 1024, temperature: float = 0.7,
+                   adapter_name: Optional[str] = None, streamer: Optional[TextIteratorStreamer] = None,
+                   speculative: Optional[str] = None, stop_rules: Optional[List[StopRule]] = None,
+                   cancel: Optional[threading.Event] = None) -> List[str]:
+    """Generate responses for several prompts in one left-padded ``generate`` call
+
+    A ``streamer`` (single prompt only) receives decoded text as it is generated.
+    A single segmented prompt resumes from the cached KV of its static preamble,
+    unless speculative decoding (``speculative``, or the adapter's configured
+    mode) is used for it. Generation stops early once ``stop_rules`` (by
+    default the adapter's configured rules) are complete for every prompt, or
+    as soon as ``cancel`` is set.
+    Constrained adapters decode under the numbered-question grammar.
+    """
     tokenizer = get_tokenizer()
     
     try:
-        input_ids = tokenizer(prompt, return_tensors="pt").input_ids.to(model.device)
+        inputs = encode_prompts(prompts).to(model.device)
+        input_length = inputs.input_ids.shape[1]
+        logits_processor = None
+        if constrained_decoding(adapter_name):
+            # Assisted generation would feed the stateful processor draft tokens
+            logits_processor = LogitsProcessorList([NumberedQuestionsLogitsProcessor(tokenizer, input_length)])
+            speculative_kwargs = {}
+        else:
+            speculative_kwargs = _speculative_kwargs(adapter_name, len(prompts), speculative)
+        prefix_ids = _static_prefix(prompts) if adapter_name is not None and not speculative_kwargs else None
+        rules = default_stop_rules(adapter_name) if stop_rules is None else stop_rules
+        criteria = [TextStoppingCriteria(tokenizer, input_length, rules)] if rules else []
+        if cancel is not None:
+            criteria.append(CancelStoppingCriteria(cancel))
+        stopping_criteria = StoppingCriteriaList(criteria) if criteria else None
         
-        with torch.no_grad():
+        with _model_lock, torch.no_grad():
+            if adapter_name is not None:
+                model.set_adapter(adapter_name)
+                _hf_residency.touch(adapter_name)
+            past_key_values = _prefix_past_key_values(model, adapter_name, prefix_ids) if prefix_ids else None
             outputs = model.generate(
-                input_ids=input_ids,
+                input_ids=inputs.input_ids,
+                attention_mask=inputs.attention_mask,
                 max_new_tokens=max_new_tokens,
                 temperature=temperature,
                 do_sample=True,
@@ -91,50 +521,475 @@ def generate_response(model, prompt: str, max_new_tokens: int = 1024, temperatur
                 pad_token_id=tokenizer.pad_token_id,
                 repetition_penalty=1.1,
                 length_penalty=1.0,
+                streamer=streamer,
+                past_key_values=past_key_values,
+                stopping_criteria=stopping_criteria,
+                logits_processor=logits_processor,
+                **speculative_kwargs,
             )
         
-        # Extract only the generated tokens (excluding the input)
-        generated_tokens = outputs[0][len(input_ids[0]):]
-        response = tokenizer.decode(generated_tokens, skip_special_tokens=True)
+        # Extract only the generated tokens (excluding the padded input)
+        responses = tokenizer.batch_decode(outputs[:, input_length:], skip_special_tokens=True)
         
-        return response.strip()
+        return [truncate_at_stop(response, rules).strip() for response in responses]
         
     except Exception as e:
         logger.error(f"Error generating response: {e}")
-        return f"Error generating response: {str(e)}"
+        if streamer is not None:
+            # Unblock the consumer if generation failed before finishing
+            streamer.end()
+        return [f"Error generating response: {str(e)}"] * len(prompts)
 
-def cleanup_models():
-    """Free up GPU memory by clearing models"""
-    global _question_model, _eval_model, _tokenizer
+def _prompt_text(prompt: Prompt) -> str:
+    return prompt if isinstance(prompt, str) else join_segments(prompt)
+
+
+class TextChunkStreamer:
+    """Iterator of text chunks for backends that produce text instead of token ids
+
+    Exposes the parts of ``TextIteratorStreamer`` the API uses: iteration
+    (with ``timeout``) and ``end()``.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.text_queue = Queue()
+        self.stop_signal = None
+        self.timeout = timeout
+
+    def put_text(self, text: str):
+        if text:
+            self.text_queue.put(text)
+
+    def end(self):
+        self.text_queue.put(self.stop_signal)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        value = self.text_queue.get(timeout=self.timeout)
+        if value == self.stop_signal:
+            raise StopIteration()
+        return value
+
+
+class InferenceBackend:
+    """Engine that runs the fine-tuned adapters
+
+    ``generate`` and ``stream`` block, so callers run them on the model
+    executor. Failures are returned as "Error generating response: ..."
+    strings, as the HF path always has.
+    """
+
+    name = "base"
+    residency: Optional[ResidencyManager] = None
+
+    def load(self, adapter_name: str):
+        """Make ``adapter_name`` ready to serve"""
+
+    def generate(self, adapter_name: str, prompts: List[Prompt], max_new_tokens: int,
+                 temperature: float) -> List[str]:
+        raise NotImplementedError
+
+    def create_streamer(self, timeout: Optional[float] = None):
+        return TextChunkStreamer(timeout=timeout)
+
+    def stream(self, adapter_name: str, prompt: Prompt, streamer, max_new_tokens: int,
+               temperature: float, cancel: Optional[threading.Event] = None) -> str:
+        raise NotImplementedError
+
+    def loaded_adapters(self) -> List[str]:
+        return []
+
+    def unload(self):
+        """Release everything the backend holds in memory"""
+
+    def release_idle(self) -> int:
+        """Evict every adapter except the most recently used one"""
+        return 0
+
+    def info(self) -> dict:
+        return {"name": self.name}
+
+
+class HFBackend(InferenceBackend):
+    """In-process transformers + PEFT generation on the shared 4-bit base model"""
+
+    name = "hf"
+    residency = _hf_residency
+
+    def load(self, adapter_name: str):
+        load_adapter(adapter_name)
+
+    def generate(self, adapter_name, prompts, max_new_tokens, temperature):
+        # Held from load to generate so another request cannot evict the adapter in between
+        with _model_lock:
+            model = load_adapter(adapter_name)
+            return generate_batch(model, prompts, max_new_tokens, temperature, adapter_name)
+
+    def create_streamer(self, timeout=None):
+        return TextIteratorStreamer(get_tokenizer(), skip_prompt=True, skip_special_tokens=True, timeout=timeout)
+
+    def stream(self, adapter_name, prompt, streamer, max_new_tokens, temperature, cancel=None):
+        with _model_lock:
+            model = load_adapter(adapter_name)
+            return generate_batch(model, [prompt], max_new_tokens, temperature, adapter_name,
+                                  streamer=streamer, cancel=cancel)[0]
+
+    def loaded_adapters(self):
+        return _loaded_adapters()
+
+    def unload(self):
+        _cleanup_hf_models()
+
+    def release_idle(self):
+        with _model_lock:
+            return self.residency.evict_idle()
+
+    def info(self):
+        return {"name": self.name, "device": DEVICE}
+
+
+class VLLMBackend(InferenceBackend):
+    """Client of a vLLM OpenAI-compatible server started with ``--enable-lora``
+
+    Each adapter is served as a LoRA module named after it, e.g.
+    ``--lora-modules question=<QUESTION_ADAPTER> eval=<EVAL_ADAPTER>``.
+    The server batches requests continuously across both adapters.
+    """
+
+    name = "vllm"
+
+    def __init__(self, base_url: str = VLLM_BASE_URL, api_key: str = VLLM_API_KEY, timeout: float = VLLM_TIMEOUT):
+        import httpx
+
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.Client(base_url=self.base_url, headers=headers, timeout=timeout)
+        self._served = set()  # Adapters the server has answered for; avoids polling it from health checks
+
+    def _payload(self, adapter_name, prompt, max_new_tokens, temperature, stream=False) -> dict:
+        if adapter_name not in ADAPTERS:
+            raise ValueError(f"Unknown adapter: {adapter_name}")
+        payload = {
+            "model": adapter_name,
+            "prompt": prompt,
+            "max_tokens": max_new_tokens,
+            "temperature": temperature,
+            "top_p": 0.95,
+            "top_k": 50,
+            "repetition_penalty": 1.1,
+            "stop": STOP_STRINGS or None,
+            "stream": stream,
+        }
+        if constrained_decoding(adapter_name):
+            payload["guided_regex"] = numbered_questions_regex()
+        return payload
+
+    def generate(self, adapter_name, prompts, max_new_tokens, temperature):
+        try:
+            texts = [_prompt_text(prompt) for prompt in prompts]
+            response = self._client.post("/completions", json=self._payload(adapter_name, texts, max_new_tokens, temperature))
+            response.raise_for_status()
+            choices = sorted(response.json()["choices"], key=lambda choice: choice["index"])
+            self._served.add(adapter_name)
+            rules = default_stop_rules(adapter_name)
+            return [truncate_at_stop(choice["text"], rules).strip() for choice in choices]
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return [f"Error generating response: {str(e)}"] * len(prompts)
+
+    def stream(self, adapter_name, prompt, streamer, max_new_tokens, temperature, cancel=None):
+        chunks = []
+        rules = default_stop_rules(adapter_name)
+        try:
+            payload = self._payload(adapter_name, _prompt_text(prompt), max_new_tokens, temperature, stream=True)
+            # Leaving the block closes the connection, which aborts the request on the server
+            with self._client.stream("POST", "/completions", json=payload) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line.startswith("data: ") or line == "data: [DONE]":
+                        continue
+                    text = json.loads(line[len("data: "):])["choices"][0]["text"]
+                    chunks.append(text)
+                    streamer.put_text(text)
+                    if rules and find_stop("".join(chunks), rules) is not None:
+                        break
+                    if cancel is not None and cancel.is_set():
+                        break  # Client went away
+            self._served.add(adapter_name)
+            return truncate_at_stop("".join(chunks), rules).strip()
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return f"Error generating response: {str(e)}"
+        finally:
+            streamer.end()
+
+    def loaded_adapters(self):
+        return sorted(self._served)
+
+    def unload(self):
+        pass  # Models live in the server process
+
+    def info(self):
+        return {"name": self.name, "base_url": self.base_url}
+
+
+class LlamaCppBackend(InferenceBackend):
+    """CPU generation with llama.cpp on one merged GGUF model per adapter
+
+    Files are memory-mapped, so a model loads in seconds and its pages are
+    shared by the OS page cache.
+    """
+
+    name = "llamacpp"
+
+    def __init__(self, model_dir: str = LLAMACPP_MODEL_DIR, n_ctx: int = LLAMACPP_N_CTX,
+                 n_threads: int = LLAMACPP_THREADS):
+        self.model_dir = model_dir
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self._models: Dict[str, object] = {}
+        self._question_grammar = None
+        # A llama.cpp context is not thread-safe
+        self._lock = threading.RLock()
+        # GGUF files are memory-mapped, so their size is what a model keeps resident
+        self.residency = ResidencyManager(lambda adapter_name: self._models.pop(adapter_name, None))
+
+    def model_path(self, adapter_name: str) -> str:
+        return os.path.join(self.model_dir, f"{adapter_name}.gguf")
+
+    def load(self, adapter_name: str):
+        if adapter_name not in ADAPTERS:
+            raise ValueError(f"Unknown adapter: {adapter_name}")
+        with self._lock:
+            if adapter_name not in self._models:
+                from llama_cpp import Llama
+
+                logger.info(f"Loading {adapter_name} GGUF model from {self.model_path(adapter_name)}...")
+                self._models[adapter_name] = Llama(
+                    model_path=self.model_path(adapter_name),
+                    n_ctx=self.n_ctx,
+                    n_threads=self.n_threads,
+                    verbose=False,
+                )
+                logger.info(f"{adapter_name.capitalize()} GGUF model loaded successfully!")
+                self.residency.admit(adapter_name, os.path.getsize(self.model_path(adapter_name)))
+            self.residency.touch(adapter_name)
+            return self._models[adapter_name]
+
+    def _grammar(self, adapter_name):
+        if not constrained_decoding(adapter_name):
+            return None
+        if self._question_grammar is None:
+            from llama_cpp import LlamaGrammar
+
+            self._question_grammar = LlamaGrammar.from_string(numbered_questions_gbnf(), verbose=False)
+        return self._question_grammar
+
+    def _complete(self, adapter_name, prompt, max_new_tokens, temperature, stream=False):
+        return self.load(adapter_name)(
+            _prompt_text(prompt),
+            max_tokens=max_new_tokens,
+            temperature=temperature,
+            top_k=50,
+            top_p=0.95,
+            repeat_penalty=1.1,
+            stop=STOP_STRINGS or None,
+            stream=stream,
+            grammar=self._grammar(adapter_name),
+        )
+
+    def generate(self, adapter_name, prompts, max_new_tokens, temperature):
+        # Streaming internally lets structural stop rules end generation early
+        return [
+            self.stream(adapter_name, prompt, TextChunkStreamer(), max_new_tokens, temperature)
+            for prompt in prompts
+        ]
+
+    def stream(self, adapter_name, prompt, streamer, max_new_tokens, temperature, cancel=None):
+        chunks = []
+        rules = default_stop_rules(adapter_name)
+        try:
+            with self._lock:
+                for chunk in self._complete(adapter_name, prompt, max_new_tokens, temperature, stream=True):
+                    text = chunk["choices"][0]["text"]
+                    chunks.append(text)
+                    streamer.put_text(text)
+                    if rules and find_stop("".join(chunks), rules) is not None:
+                        break
+                    if cancel is not None and cancel.is_set():
+                        break  # Client went away
+            return truncate_at_stop("".join(chunks), rules).strip()
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return f"Error generating response: {str(e)}"
+        finally:
+            streamer.end()
+
+    def loaded_adapters(self):
+        return list(self._models)
+
+    def unload(self):
+        with self._lock:
+            self._models.clear()
+            self.residency.clear()
+
+    def release_idle(self):
+        with self._lock:
+            return self.residency.evict_idle()
+
+    def info(self):
+        return {"name": self.name, "model_dir": self.model_dir, "n_threads": self.n_threads}
+
+
+BACKENDS = {
+    HFBackend.name: HFBackend,
+    VLLMBackend.name: VLLMBackend,
+    LlamaCppBackend.name: LlamaCppBackend,
+}
+
+# Singleton backend
+_backend = None
+
+def get_backend() -> InferenceBackend:
+    """Get the inference backend selected by INFERENCE_BACKEND"""
+    global _backend
+    if _backend is None:
+        if INFERENCE_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown inference backend: {INFERENCE_BACKEND} (expected one of {', '.join(BACKENDS)})")
+        _backend = BACKENDS[INFERENCE_BACKEND]()
+        logger.info(f"Using {INFERENCE_BACKEND} inference backend")
+    return _backend
+
+def generate_for_adapter(adapter_name: str, prompts: List[Prompt], max_new_tokens: int = 1024,
+                         temperature: float = 0.7) -> List[str]:
+    """Load ``adapter_name`` if needed and generate a batch of responses with it"""
+    return get_backend().generate(adapter_name, prompts, max_new_tokens, temperature)
+
+def create_streamer(timeout: Optional[float] = None):
+    """Create a streamer that yields decoded text chunks while generating"""
+    return get_backend().create_streamer(timeout)
+
+def stream_for_adapter(adapter_name: str, prompt: Prompt, streamer, max_new_tokens: int = 1024,
+                       temperature: float = 0.7, cancel: Optional[threading.Event] = None) -> str:
+    """Generate one response with ``adapter_name``, pushing text to ``streamer``
+
+    Blocks until generation is complete or ``cancel`` is set; consume the
+    streamer from another thread.
+    """
+    return get_backend().stream(adapter_name, prompt, streamer, max_new_tokens, temperature, cancel)
+
+# component -> {"status": "loading" | "loaded" | "failed", "duration_seconds", "error"}
+_load_states: Dict[str, dict] = {}
+
+def _track_load(component: str, fn):
+    _load_states[component] = {"status": "loading", "duration_seconds": None, "error": None}
+    start = time.time()
+    try:
+        fn()
+    except Exception as e:
+        _load_states[component] = {"status": "failed", "duration_seconds": round(time.time() - start, 2), "error": str(e)}
+        logger.error(f"Preloading {component} failed: {e}")
+        return False
+    _load_states[component] = {"status": "loaded", "duration_seconds": round(time.time() - start, 2), "error": None}
+    logger.info(f"Preloaded {component} in {time.time() - start:.2f} seconds")
+    return True
+
+def _warm_up(adapter_name: str, prompt: Prompt):
+    response = get_backend().generate(adapter_name, [prompt], WARMUP_MAX_NEW_TOKENS, 0.7)[0]
+    if response.startswith("Error generating response"):
+        raise RuntimeError(response)
+
+def preload_models(warmup: bool = True) -> bool:
+    """Load the tokenizer, base model and both adapters, then warm each adapter up
+
+    Blocking; run it on the model executor. Returns True if everything loaded.
+    """
+    backend = get_backend()
+    ok = True
+    if isinstance(backend, HFBackend):
+        ok = _track_load("tokenizer", get_tokenizer) and _track_load("base_model", get_base_model)
     
-    if _question_model is not None:
-        del _question_model
-        _question_model = None
+    warmup_prompts = {
+        QUESTION_ADAPTER_NAME: question_prompt_segments(SAMPLE_STARTUP),
+        EVAL_ADAPTER_NAME: evaluation_prompt_segments(SAMPLE_STARTUP, SAMPLE_QUESTIONS, SAMPLE_ANSWERS),
+    }
+    for adapter_name in ADAPTERS:
+        if not ok:
+            break
+        ok = _track_load(f"{adapter_name}_adapter", lambda: backend.load(adapter_name))
+        if ok and warmup:
+            # The warm-up prompt also fills the prefix KV cache for the real prompts
+            ok = _track_load(f"{adapter_name}_warmup", lambda: _warm_up(adapter_name, warmup_prompts[adapter_name]))
+    return ok
+
+def get_load_states() -> Dict[str, dict]:
+    """Per-component preload state and duration"""
+    return {component: dict(state) for component, state in _load_states.items()}
+
+def cleanup_models():
+    """Free up memory held by the inference backend"""
+    get_backend().unload()
+    _load_states.clear()
+    logger.info("Models cleaned up successfully!")
+
+def release_idle_models() -> int:
+    """Evict every adapter except the most recently used one, keeping the base model loaded"""
+    evicted = get_backend().release_idle()
+    logger.info(f"Released {evicted} idle adapter(s)")
+    return evicted
+
+def _cleanup_hf_models():
+    global _peft_model, _base_model, _draft_model, _draft_model_error, _tokenizer
     
-    if _eval_model is not None:
-        del _eval_model
-        _eval_model = None
+    with _model_lock:
+        if _peft_model is not None:
+            del _peft_model
+            _peft_model = None
+        
+        if _base_model is not None:
+            del _base_model
+            _base_model = None
+        
+        _draft_model = None
+        _draft_model_error = None
+        _prefix_cache.clear()
+        _hf_residency.clear()
     
     if _tokenizer is not None:
         del _tokenizer
         _tokenizer = None
+    _encode_static.cache_clear()
     
     if torch.cuda.is_available():
         torch.cuda.empty_cache()
-    
-    logger.info("Models cleaned up successfully!")
 
 def get_model_info():
     """Get information about loaded models"""
+    loaded_adapters = get_backend().loaded_adapters()
     return {
+        "backend": get_backend().info(),
         "base_model": BASE_MODEL,
+        "artifacts_dir": MODEL_ARTIFACTS_DIR or None,
         "question_adapter": QUESTION_ADAPTER,
         "eval_adapter": EVAL_ADAPTER,
         "device": DEVICE,
         "cuda_available": torch.cuda.is_available(),
         "models_loaded": {
             "tokenizer": _tokenizer is not None,
-            "question_model": _question_model is not None,
-            "eval_model": _eval_model is not None
-        }
+            "base_model": _base_model is not None,
+            "question_model": QUESTION_ADAPTER_NAME in loaded_adapters,
+            "eval_model": EVAL_ADAPTER_NAME in loaded_adapters
+        },
+        "loaded_adapters": loaded_adapters,
+        "tokenizer": dict(_tokenizer_status, static_segments_cached=_encode_static.cache_info().currsize),
+        "prefix_cache": dict(_prefix_stats, enabled=PREFIX_CACHE_ENABLED, entries=len(_prefix_cache)),
+        "speculative": {
+            "modes": SPECULATIVE_MODES,
+            "generations": dict(_speculative_stats),
+            "draft_model_error": _draft_model_error,
+        },
+        "constrained_questions": CONSTRAINED_QUESTIONS,
+        "residency": get_backend().residency.stats() if get_backend().residency is not None else None
     }
\ No newline at end of file
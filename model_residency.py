@@ -0,0 +1,104 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Memory budget for resident models and adapters; 0 disables eviction
+MODEL_MEMORY_BUDGET_MB = float(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+
+
+class ResidencyManager:
+    """Tracks memory of loaded models and evicts least-recently-used ones over budget
+
+    Pinned entries (the shared base model) are counted but never evicted, and
+    the entry being admitted is never evicted to make room for itself.
+    ``evict`` is called with the entry name and must free it; callers hold
+    the model lock, so nothing is generating with an entry while it is evicted.
+    """
+
+    def __init__(self, evict: Callable[[str], None], budget_bytes: int = int(MODEL_MEMORY_BUDGET_MB * 1024 * 1024)):
+        self.budget_bytes = budget_bytes
+        self._evict = evict
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()  # name -> {bytes, device, pinned, loaded_at, last_used}
+        self._lock = threading.RLock()
+        self._loads = 0
+        self._evictions = 0
+        self._hits = 0
+
+    @property
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(entry["bytes"] for entry in self._entries.values())
+
+    def admit(self, name: str, size_bytes: int, device: str = "cpu", pinned: bool = False):
+        """Record a newly loaded entry, then evict others until the budget is met"""
+        now = time.time()
+        with self._lock:
+            self._entries[name] = {"bytes": size_bytes, "device": device, "pinned": pinned, "loaded_at": now, "last_used": now}
+            self._entries.move_to_end(name)
+            self._loads += 1
+            logger.info(f"Loaded {name} ({size_bytes / 1024 / 1024:.0f} MB on {device})")
+            self.enforce_budget(keep=name)
+
+    def touch(self, name: str):
+        """Mark an entry as used so it becomes the last candidate for eviction"""
+        with self._lock:
+            if name in self._entries:
+                self._entries[name]["last_used"] = time.time()
+                self._entries.move_to_end(name)
+                self._hits += 1
+
+    def evict(self, name: str):
+        with self._lock:
+            if name not in self._entries:
+                return
+            logger.info(f"Evicting {name} ({self._entries[name]['bytes'] / 1024 / 1024:.0f} MB)")
+            self._evict(name)
+            del self._entries[name]
+            self._evictions += 1
+
+    def enforce_budget(self, keep: Optional[str] = None):
+        """Evict least-recently-used unpinned entries (except ``keep``) until under budget"""
+        if self.budget_bytes <= 0:
+            return
+        with self._lock:
+            for name in list(self._entries):
+                if self.resident_bytes <= self.budget_bytes:
+                    break
+                if name != keep and not self._entries[name]["pinned"]:
+                    self.evict(name)
+            if self.resident_bytes > self.budget_bytes:
+                logger.warning(f"Resident models use {self.resident_bytes / 1024 / 1024:.0f} MB, over the "
+                               f"{self.budget_bytes / 1024 / 1024:.0f} MB budget, with nothing left to evict")
+
+    def evict_idle(self, keep_latest: int = 1) -> int:
+        """Evict every unpinned entry except the ``keep_latest`` most recently used; returns the count"""
+        with self._lock:
+            unpinned = [name for name, entry in self._entries.items() if not entry["pinned"]]
+            idle = unpinned[:max(0, len(unpinned) - keep_latest)]
+            for name in idle:
+                self.evict(name)
+            return len(idle)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": self.resident_bytes,
+                "loads": self._loads,
+                "evictions": self._evictions,
+                "hits": self._hits,
+                "entries": {
+                    name: {"bytes": entry["bytes"], "device": entry["device"], "pinned": entry["pinned"],
+                           "idle_seconds": round(time.time() - entry["last_used"], 1)}
+                    for name, entry in self._entries.items()
+                },
+            }
@@ -1,11 +1,149 @@
 import os
-from groq import Groq
+import asyncio
+import random
+import httpx
+from groq import AsyncGroq, RateLimitError
 import logging
 import time
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "120"))
+GROQ_BACKOFF_BASE = 2.0
+GROQ_BACKOFF_MAX = 30.0
+
+# Client-side budget for the Groq tier (requests and tokens per minute)
+GROQ_RPM_LIMIT = int(os.getenv("GROQ_RPM_LIMIT", "30"))
+GROQ_TPM_LIMIT = int(os.getenv("GROQ_TPM_LIMIT", "12000"))
+GROQ_MAX_QUEUE_WAIT = float(os.getenv("GROQ_MAX_QUEUE_WAIT", "30"))  # seconds; longer waits are shed
+
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate for Llama-family tokenizers (~4 characters per token)"""
+    return len(text) // CHARS_PER_TOKEN + 8  # + chat template overhead
+
+class RateLimitExceeded(Exception):
+    """Raised when a Groq request would exceed the local budget wait limit"""
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``capacity`` per minute
+
+    The balance may go negative: a request reserves its cost immediately and
+    waits out the deficit, so later callers queue behind it in order.
+    """
+
+    def __init__(self, capacity: float):
+        self.capacity = capacity
+        self.rate = capacity / 60.0
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken"""
+        self._refill()
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+    def consume(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+    def refund(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self):
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+class GroqRateLimiter:
+    """Client-side RPM + TPM limiter for Groq requests
+
+    Requests are queued (delayed) until both budgets allow them, or shed with
+    RateLimitExceeded if the wait would exceed ``max_wait`` seconds.
+    """
+
+    def __init__(self, rpm: int = GROQ_RPM_LIMIT, tpm: int = GROQ_TPM_LIMIT,
+                 max_wait: float = GROQ_MAX_QUEUE_WAIT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_wait = max_wait
+        self._waiting = 0
+        self._admitted = 0
+        self._shed = 0
+        self._total_wait = 0.0
+        self._tokens_estimated = 0
+        self._tokens_used = 0
+
+    async def acquire(self, estimated_tokens: int) -> int:
+        """Wait until the request fits the budget; return the tokens reserved"""
+        # A single request larger than the whole minute budget could never fit
+        estimated_tokens = min(estimated_tokens, int(self.tokens.capacity))
+        wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+        
+        if wait > self.max_wait:
+            self._shed += 1
+            raise RateLimitExceeded(
+                f"Groq budget exhausted: request would wait {wait:.1f}s (limit {self.max_wait:.0f}s)"
+            )
+        
+        # Reserve now so requests arriving later queue behind this one
+        self.requests.consume(1)
+        self.tokens.consume(estimated_tokens)
+        self._admitted += 1
+        self._tokens_estimated += estimated_tokens
+        
+        if wait > 0:
+            logger.info(f"Groq budget: delaying request {wait:.1f}s")
+            self._waiting += 1
+            self._total_wait += wait
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._waiting -= 1
+        return estimated_tokens
+
+    def record_usage(self, reserved_tokens: int, actual_tokens: Optional[int]):
+        """Reconcile a reservation with the token count Groq reported"""
+        if actual_tokens is None:
+            return
+        self._tokens_used += actual_tokens
+        if actual_tokens < reserved_tokens:
+            self.tokens.refund(reserved_tokens - actual_tokens)
+        else:
+            self.tokens.consume(actual_tokens - reserved_tokens)
+
+    def penalize(self):
+        """Pause new requests after the server itself rate limited us"""
+        self.requests.drain()
+
+    def usage(self) -> dict:
+        request_wait = self.requests.wait_time(1)
+        return {
+            "rpm_limit": self.requests.capacity,
+            "tpm_limit": self.tokens.capacity,
+            "requests_available": round(self.requests.tokens, 2),
+            "tokens_available": round(self.tokens.tokens, 1),
+            "rpm_utilization": round(1 - self.requests.tokens / self.requests.capacity, 3),
+            "tpm_utilization": round(1 - self.tokens.tokens / self.tokens.capacity, 3),
+            "next_request_wait_seconds": round(request_wait, 2),
+            "max_queue_wait_seconds": self.max_wait,
+            "waiting": self._waiting,
+            "admitted": self._admitted,
+            "shed": self._shed,
+            "total_wait_seconds": round(self._total_wait, 1),
+            "tokens_estimated": self._tokens_estimated,
+            "tokens_used": self._tokens_used,
+        }
+
 class GroqClient:
     def __init__(self, api_key: Optional[str] = None):
         """Initialize Groq client with API key"""
@@ -27,63 +165,148 @@ class GroqClient:
                 "3. Get your key from: https://console.groq.com/"
             )
         
-        self.client = Groq(api_key=self.api_key)
+        # One pooled HTTP client shared by every request; retries are handled
+        # here (with non-blocking backoff) rather than inside the SDK
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=GROQ_MAX_CONNECTIONS
+            ),
+            timeout=GROQ_TIMEOUT
+        )
+        self.client = AsyncGroq(api_key=self.api_key, http_client=self.http_client, max_retries=0)
         self.model = "llama-3.3-70b-versatile"
+        self._semaphore = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+        self.rate_limiter = GroqRateLimiter()
         
         logger.info(f"🚀 Groq client initialized with key: {self.api_key[:8]}...{self.api_key[-4:]}")
 
-    def enhance_evaluation(self, prompt: str, max_retries: int = 3) -> str:
-        """Call Groq API to enhance evaluation with retry logic"""
-        
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(GROQ_BACKOFF_MAX, GROQ_BACKOFF_BASE * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds requested by a ``retry-after`` header on a 429/5xx response"""
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        value = response.headers.get("retry-after")
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    async def _complete(self, prompt: str, temperature: float, max_tokens: int, label: str,
+                        failure_message: str, max_retries: int, **request_options) -> str:
+        """Run a chat completion with retries, backoff and the concurrency cap
+
+        ``request_options`` are passed through to the API (e.g. ``response_format``).
+        """
         for attempt in range(max_retries):
             try:
-                logger.info(f"Calling Groq API (attempt {attempt + 1}/{max_retries})...")
+                reserved = await self.rate_limiter.acquire(estimate_tokens(prompt) + max_tokens)
+                logger.info(f"Calling Groq API for {label} (attempt {attempt + 1}/{max_retries})...")
                 
-                chat_completion = self.client.chat.completions.create(
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    model=self.model,
-                    temperature=0.3,
-                    max_tokens=3000,
-                    top_p=0.9,
-                    stream=False
-                )
+                async with self._semaphore:
+                    chat_completion = await self.client.chat.completions.create(
+                        messages=[
+                            {
+                                "role": "user",
+                                "content": prompt
+                            }
+                        ],
+                        model=self.model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        top_p=0.9,
+                        stream=False,
+                        **request_options
+                    )
                 
+                usage = getattr(chat_completion, "usage", None)
+                self.rate_limiter.record_usage(reserved, getattr(usage, "total_tokens", None))
                 response = chat_completion.choices[0].message.content
                 
                 if response and len(response.strip()) > 50:
-                    logger.info("Groq API call successful")
+                    logger.info(f"Groq {label} successful")
                     return response.strip()
-                else:
-                    logger.warning("Groq returned empty or very short response")
-                    if attempt == max_retries - 1:
-                        return "Error: Groq returned insufficient content"
                 
-            except Exception as e:
-                logger.error(f"Groq API error (attempt {attempt + 1}): {str(e)}")
+                logger.warning(f"Groq returned empty or very short response for {label}")
+                if attempt == max_retries - 1:
+                    return "Error: Groq returned insufficient content"
+                continue
+                
+            except RateLimitExceeded as e:
+                # Shed locally instead of queueing past the wait limit
+                logger.warning(f"Shedding Groq {label}: {str(e)}")
+                return f"Error: {str(e)}"
                 
+            except RateLimitError as e:
+                logger.warning(f"Groq rate limited {label} (attempt {attempt + 1}): {str(e)}")
+                self.rate_limiter.penalize()
                 if attempt == max_retries - 1:
-                    return f"Error: Failed to get enhanced evaluation after {max_retries} attempts. Last error: {str(e)}"
+                    return f"Error: {failure_message} after {max_retries} attempts. Last error: {str(e)}"
+                wait_time = self._retry_after(e) or self._backoff(attempt)
                 
-                # Wait before retrying (exponential backoff)
-                wait_time = (2 ** attempt) + 1
-                logger.info(f"Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+            except Exception as e:
+                logger.error(f"Groq API error for {label} (attempt {attempt + 1}): {str(e)}")
+                if attempt == max_retries - 1:
+                    return f"Error: {failure_message} after {max_retries} attempts. Last error: {str(e)}"
+                wait_time = self._retry_after(e) or self._backoff(attempt)
+            
+            # Wait before retrying without blocking the event loop
+            logger.info(f"Waiting {wait_time:.1f} seconds before retry...")
+            await asyncio.sleep(wait_time)
         
         return "Error: Maximum retries exceeded"
 
-    def enhance_questions(self, prompt: str, max_retries: int = 3) -> str:
+    async def enhance_evaluation(self, prompt: str, max_retries: int = 3) -> str:
+        """Call Groq API to enhance evaluation with retry logic"""
+        return await self._complete(
+            prompt, temperature=0.3, max_tokens=3000, label="evaluation enhancement",
+            failure_message="Failed to get enhanced evaluation", max_retries=max_retries
+        )
+
+    async def enhance_evaluation_json(self, prompt: str, max_retries: int = 3) -> str:
+        """Call Groq API in JSON mode for a structured evaluation (returns the raw JSON text)"""
+        return await self._complete(
+            prompt, temperature=0.3, max_tokens=4000, label="structured evaluation",
+            failure_message="Failed to get structured evaluation", max_retries=max_retries,
+            response_format={"type": "json_object"}
+        )
+
+    async def enhance_questions(self, prompt: str, max_retries: int = 3) -> str:
         """Call Groq API to enhance questions with retry logic"""
-        
+        return await self._complete(
+            prompt, temperature=0.4, max_tokens=1500, label="question enhancement",
+            failure_message="Failed to enhance questions", max_retries=max_retries
+        )
+
+    @staticmethod
+    def _stream_usage(chunk) -> Optional[int]:
+        """Total tokens reported on a stream chunk (Groq sends usage with the last one)"""
+        for usage in (getattr(chunk, "usage", None), getattr(getattr(chunk, "x_groq", None), "usage", None)):
+            total = usage.get("total_tokens") if isinstance(usage, dict) else getattr(usage, "total_tokens", None)
+            if total is not None:
+                return total
+        return None
+
+    async def stream_completion(self, prompt: str, temperature: float, max_tokens: int,
+                                label: str = "completion", max_retries: int = 3):
+        """Stream a chat completion from Groq, yielding text chunks as they arrive
+
+        Opening the stream is retried like ``_complete`` (backoff with jitter,
+        honouring ``retry-after``); once text has been yielded it is not. The
+        budget reservation is reconciled when the stream ends (or is closed
+        early) with the usage Groq reports, or an estimate of what was generated.
+        """
         for attempt in range(max_retries):
+            reserved = await self.rate_limiter.acquire(estimate_tokens(prompt) + max_tokens)
+            logger.info(f"Streaming Groq {label} (attempt {attempt + 1}/{max_retries})...")
+            await self._semaphore.acquire()
             try:
-                logger.info(f"Calling Groq API for question enhancement (attempt {attempt + 1}/{max_retries})...")
-                
-                chat_completion = self.client.chat.completions.create(
+                stream = await self.client.chat.completions.create(
                     messages=[
                         {
                             "role": "user",
@@ -91,49 +314,65 @@ class GroqClient:
                         }
                     ],
                     model=self.model,
-                    temperature=0.4,
-                    max_tokens=1500,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
                     top_p=0.9,
-                    stream=False
+                    stream=True
                 )
-                
-                response = chat_completion.choices[0].message.content
-                
-                if response and len(response.strip()) > 50:
-                    logger.info("Groq question enhancement successful")
-                    return response.strip()
-                else:
-                    logger.warning("Groq returned empty or very short response for questions")
-                    if attempt == max_retries - 1:
-                        return "Error: Groq returned insufficient content"
-                
-            except Exception as e:
-                logger.error(f"Groq API error for questions (attempt {attempt + 1}): {str(e)}")
-                
-                if attempt == max_retries - 1:
-                    return f"Error: Failed to enhance questions after {max_retries} attempts. Last error: {str(e)}"
-                
-                # Wait before retrying
-                wait_time = (2 ** attempt) + 1
-                logger.info(f"Waiting {wait_time} seconds before retry...")
-                time.sleep(wait_time)
+            except BaseException as e:
+                # A request that failed before streaming used nothing
+                self._semaphore.release()
+                self.rate_limiter.record_usage(reserved, 0)
+                if isinstance(e, RateLimitError):
+                    self.rate_limiter.penalize()
+                if not isinstance(e, Exception) or attempt == max_retries - 1:
+                    raise
+                logger.warning(f"Groq stream for {label} failed to start (attempt {attempt + 1}): {str(e)}")
+                wait_time = self._retry_after(e) or self._backoff(attempt)
+                logger.info(f"Waiting {wait_time:.1f} seconds before retry...")
+                await asyncio.sleep(wait_time)
+                continue
+            break
         
-        return "Error: Maximum retries exceeded"
+        used_tokens = None
+        generated_chars = 0
+        try:
+            async for chunk in stream:
+                used_tokens = self._stream_usage(chunk) or used_tokens
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    generated_chars += len(delta)
+                    yield delta
+        finally:
+            self._semaphore.release()
+            if used_tokens is None:
+                used_tokens = estimate_tokens(prompt) + generated_chars // CHARS_PER_TOKEN
+            self.rate_limiter.record_usage(reserved, used_tokens)
 
-    def test_connection(self) -> bool:
+    def stream_evaluation(self, prompt: str):
+        """Stream an enhanced evaluation (same settings as ``enhance_evaluation``)"""
+        return self.stream_completion(prompt, temperature=0.3, max_tokens=3000, label="evaluation enhancement")
+
+    def stream_questions(self, prompt: str):
+        """Stream enhanced questions (same settings as ``enhance_questions``)"""
+        return self.stream_completion(prompt, temperature=0.4, max_tokens=1500, label="question enhancement")
+
+    async def test_connection(self) -> bool:
         """Test connection to Groq API"""
         try:
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "user",
-                        "content": "Hello! Just testing the connection. Please respond with 'Connection successful!'"
-                    }
-                ],
-                model=self.model,
-                temperature=0.1,
-                max_tokens=50
-            )
+            await self.rate_limiter.acquire(estimate_tokens("Hello! Just testing the connection.") + 50)
+            async with self._semaphore:
+                chat_completion = await self.client.chat.completions.create(
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": "Hello! Just testing the connection. Please respond with 'Connection successful!'"
+                        }
+                    ],
+                    model=self.model,
+                    temperature=0.1,
+                    max_tokens=50
+                )
             
             response = chat_completion.choices[0].message.content
             logger.info(f"Groq connection test response: {response}")
@@ -144,13 +383,23 @@ class GroqClient:
             logger.error(f"Groq connection test failed: {str(e)}")
             return False
 
+    async def aclose(self):
+        """Close pooled connections"""
+        await self.http_client.aclose()
+
+    def get_budget_usage(self) -> dict:
+        """Get current RPM/TPM budget usage"""
+        return self.rate_limiter.usage()
+
     def get_model_info(self) -> dict:
         """Get information about the Groq model being used"""
         return {
             "model": self.model,
             "provider": "Groq",
             "api_key_set": bool(self.api_key),
-            "api_key_preview": self.api_key[:8] + "..." if self.api_key else None
+            "api_key_preview": self.api_key[:8] + "..." if self.api_key else None,
+            "max_concurrency": GROQ_MAX_CONCURRENCY,
+            "max_connections": GROQ_MAX_CONNECTIONS
         }
 
 # Singleton instance
@@ -165,11 +414,19 @@ def get_groq_client(api_key: Optional[str] = None) -> GroqClient:
     
     return _groq_client
 
-def test_groq_setup() -> dict:
+async def close_groq_client():
+    """Close the singleton client's connection pool"""
+    global _groq_client
+    
+    if _groq_client is not None:
+        await _groq_client.aclose()
+        _groq_client = None
+
+async def test_groq_setup() -> dict:
     """Test Groq setup and return status"""
     try:
         client = get_groq_client()
-        connection_ok = client.test_connection()
+        connection_ok = await client.test_connection()
         
         return {
             "groq_configured": True,
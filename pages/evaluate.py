@@ -1,12 +1,8 @@
 import os, json, time, uuid
-from pathlib import Path
 import streamlit as st
 import requests   # <-- API call ke liye
 from ui2 import API_BASE_URL   # <-- yaha se updated BASE URL ayega
-
-DATA_DIR = Path("data")
-DATA_DIR.mkdir(exist_ok=True)
-REPORTS_PATH = DATA_DIR / "reports.jsonl"
+from report_store import get_report_store
 
 st.title("Evaluate a Startup Idea")
 st.caption("Paste your idea or deck summary. We’ll score & suggest next steps.")
@@ -73,8 +69,7 @@ if submitted and idea.strip():
             "idea": idea, "market": market, "extras": extras,
             "result": result
         }
-        with open(REPORTS_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        get_report_store().append(record)
 
         st.download_button(
             "Download JSON report",
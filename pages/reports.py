@@ -1,13 +1,64 @@
-import json
-from pathlib import Path
+import math
+from datetime import datetime, time, timedelta
 import streamlit as st
+from report_store import get_report_store
+
+SORT_OPTIONS = {
+    "Newest first": ("timestamp", True),
+    "Oldest first": ("timestamp", False),
+    "Highest score": ("score", True),
+    "Lowest score": ("score", False),
+}
+
+@st.cache_data(show_spinner=False, max_entries=200)
+def load_report(report_id):
+    # Saved reports never change, so full records can be cached by id
+    return get_report_store().get(report_id)
 
-REPORTS_PATH = Path("data/reports.jsonl")
 st.title("Saved Reports")
-if not REPORTS_PATH.exists():
-    st.info("No reports yet.")
-else:
-    rows = [json.loads(line) for line in REPORTS_PATH.read_text(encoding="utf-8").splitlines() if line.strip()]
-    for row in reversed(rows[-50:]):
-        with st.expander(f"📄 {row['result']['overall_score']}/100 • {row['idea'][:60]}…"):
-            st.json(row)
+store = get_report_store()
+
+# --- Filters and sorting (all answered from the store's indexes) ---
+f1, f2, f3, f4 = st.columns([1.2, 1.2, 1, 0.6])
+with f1:
+    score_range = st.slider("Score", 0, 100, (0, 100))
+with f2:
+    date_range = st.date_input("Date range", value=())
+with f3:
+    sort, descending = SORT_OPTIONS[st.selectbox("Sort by", list(SORT_OPTIONS))]
+with f4:
+    page_size = st.selectbox("Per page", [10, 25, 50], index=1)
+
+filters = {}
+if score_range != (0, 100):
+    filters.update(min_score=score_range[0], max_score=score_range[1])
+if len(date_range) == 2:
+    filters.update(
+        since=datetime.combine(date_range[0], time.min).timestamp(),
+        until=datetime.combine(date_range[1] + timedelta(days=1), time.min).timestamp(),
+    )
+
+total = store.count(**filters)
+if not total:
+    st.info("No reports yet." if not filters else "No reports match these filters.")
+    st.stop()
+
+pages = math.ceil(total / page_size)
+page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1)
+st.caption(f"{total} report(s)")
+
+# --- Summary rows; the full record is loaded only when a row is opened ---
+for row in store.list(limit=page_size, offset=(page - 1) * page_size, sort=sort, descending=descending, **filters):
+    score = f"{row['score']:g}" if row["score"] is not None else "N/A"
+    saved = datetime.fromtimestamp(row["ts"]).strftime("%Y-%m-%d %H:%M")
+    summary, toggle = st.columns([0.85, 0.15])
+    with summary:
+        st.markdown(f"📄 **{score}/100** • {row['idea_prefix'][:60]}… • {saved}")
+    with toggle:
+        show = st.toggle("Details", key=f"report_{row['id']}")
+    if show:
+        record = load_report(row["id"])
+        if record is None:
+            st.warning("This report no longer exists.")
+        else:
+            st.json(record)
@@ -1,41 +1,80 @@
+from typing import List, Tuple, Union
+
+from evaluation_parser import parse_evaluation
+
+# A prompt for the fine-tuned models can be passed as (text, is_static)
+# segments. Static segments are identical for every request, so their token
+# ids are cached; only the variable startup fields are tokenized per request.
+# Segment boundaries sit where the tokenizer's pre-tokenizer always splits
+# (after ":" or a newline followed by a letter), so encoding the segments
+# separately gives the same ids as encoding the joined text. An empty question
+# group leaves a segment starting with a newline; such prompts are tokenized
+# whole (see model_loading._segments_splittable).
+Segment = Tuple[str, bool]
+Prompt = Union[str, List[Segment]]
+
+def join_segments(segments: List[Segment]) -> str:
+    """Join prompt segments back into the full prompt text"""
+    return "".join(text for text, _ in segments)
+
+def _startup_segments(startup):
+    return [
+        (f" {startup['name']}\n", False),
+        ("Industry:", True),
+        (f" {startup['industry']}\n", False),
+        ("Pitch:", True),
+        (f" {startup['pitch']}\n", False),
+        ("Founded Year:", True),
+        (f" {startup['founded_year']}\n", False),
+        ("Funding:", True),
+        (f" {startup['funding']}\n\n", False),
+    ]
+
+def question_prompt_segments(startup) -> List[Segment]:
+    """Question generation prompt split into static and variable segments"""
+    return [
+        ("<s>[INST] Analyze this startup:\nName:", True),
+        *_startup_segments(startup),
+        ("Ask 10 smart questions (7 VC-style + 3 industry-specific). Include 1 question to judge founder capability. [/INST]\n", True),
+    ]
+
 def build_question_prompt(startup):
     """Build prompt for question generation model"""
-    return (
-        f"<s>[INST] Analyze this startup:\n"
-        f"Name: {startup['name']}\n"
-        f"Industry: {startup['industry']}\n"
-        f"Pitch: {startup['pitch']}\n"
-        f"Founded Year: {startup['founded_year']}\n"
-        f"Funding: {startup['funding']}\n\n"
-        "Ask 10 smart questions (7 VC-style + 3 industry-specific). Include 1 question to judge founder capability. [/INST]\n"
-    )
+    return join_segments(question_prompt_segments(startup))
 
-def build_evaluation_prompt(startup, questions, answers):
-    """Build simplified evaluation prompt for fine-tuned model"""
+def evaluation_prompt_segments(startup, questions, answers) -> List[Segment]:
+    """Evaluation prompt split into static and variable segments"""
     vc_qs = "\n".join([f"{i+1}. {q}" for i, q in enumerate(questions[:7])])
     ind_qs = "\n".join([f"{i+8}. {q}" for i, q in enumerate(questions[7:])])
     ans = "\n".join([f"{i+1}. {a}" for i, a in enumerate(answers)])
 
-    return (
-        "<s>[INST] Evaluate this startup based on the information provided:\n\n"
-        f"Startup Info:\n"
-        f"Name: {startup['name']}\n"
-        f"Industry: {startup['industry']}\n"
-        f"Pitch: {startup['pitch']}\n"
-        f"Founded Year: {startup['founded_year']}\n"
-        f"Funding: {startup['funding']}\n\n"
-        f"VC Questions:\n{vc_qs}\n\n"
-        f"Industry-Specific Questions:\n{ind_qs}\n\n"
-        f"Founder Answers:\n{ans}\n\n"
-        "Provide a startup evaluation covering key business metrics, traction, team, market potential, and risks. [/INST]\n"
-    )
-
-def build_groq_enhancement_prompt(startup, questions, answers, raw_evaluation):
-    """Build prompt for Groq Llama 70B to enhance the evaluation"""
+    return [
+        ("<s>[INST] Evaluate this startup based on the information provided:\n\nStartup Info:\nName:", True),
+        *_startup_segments(startup),
+        ("VC Questions:\n", True),
+        (f"{vc_qs}\n\n", False),
+        ("Industry-Specific Questions:\n", True),
+        (f"{ind_qs}\n\n", False),
+        ("Founder Answers:\n", True),
+        (f"{ans}\n\n", False),
+        ("Provide a startup evaluation covering key business metrics, traction, team, market potential, and risks. [/INST]\n", True),
+    ]
+
+def build_evaluation_prompt(startup, questions, answers):
+    """Build simplified evaluation prompt for fine-tuned model"""
+    return join_segments(evaluation_prompt_segments(startup, questions, answers))
+
+def build_groq_enhancement_prompt(startup, questions, answers, raw_evaluation=None):
+    """Build prompt for Groq Llama 70B to enhance the evaluation
+
+    Without ``raw_evaluation`` Groq writes the evaluation from the answers alone.
+    """
+    basis = "raw evaluation" if raw_evaluation is not None else "founder's answers"
+    raw_section = f"RAW AI EVALUATION:\n{raw_evaluation}\n\n" if raw_evaluation is not None else ""
     questions_text = "\n".join([f"{i+1}. {q}" for i, q in enumerate(questions)])
     answers_text = "\n".join([f"{i+1}. {a}" for i, a in enumerate(answers)])
     
-    return f"""You are a senior VC analyst with 15+ years of experience evaluating startups. Based on the startup information and raw evaluation below, create a comprehensive, professional startup evaluation report.
+    return f"""You are a senior VC analyst with 15+ years of experience evaluating startups. Based on the startup information and {basis} below, create a comprehensive, professional startup evaluation report.
 
 STARTUP INFORMATION:
 - Name: {startup['name']}
@@ -50,10 +89,7 @@ QUESTIONS ASKED:
 FOUNDER'S ANSWERS:
 {answers_text}
 
-RAW AI EVALUATION:
-{raw_evaluation}
-
-TASK: Create a structured VC-style evaluation report covering these 15 key metrics (provide score 1-10, strength, weakness, and improvement tip for each):
+{raw_section}TASK: Create a structured VC-style evaluation report covering these 15 key metrics (provide score 1-10, strength, weakness, and improvement tip for each):
 
 1. Market Size & Opportunity
 2. Product-Market Fit  
@@ -80,6 +116,65 @@ FORMAT REQUIREMENTS:
 
 Create a comprehensive evaluation that would be suitable for presenting to an investment committee."""
 
+EVALUATION_METRICS = [
+    "Market Size & Opportunity",
+    "Product-Market Fit",
+    "Competitive Advantage",
+    "Traction & Growth",
+    "Revenue Model & Unit Economics",
+    "Financial Health & Runway",
+    "Team Strength & Experience",
+    "Scalability Potential",
+    "Technology & Innovation",
+    "Customer Acquisition Strategy",
+    "Risk Assessment",
+    "Regulatory & Compliance",
+    "ESG & Social Impact",
+    "Investment Attractiveness",
+    "Future Growth Potential",
+]
+
+def build_groq_structured_evaluation_prompt(startup, questions, answers, raw_evaluation=None):
+    """Build prompt for Groq JSON mode: the same 15-metric evaluation as a JSON object"""
+    questions_text = "\n".join([f"{i+1}. {q}" for i, q in enumerate(questions)])
+    answers_text = "\n".join([f"{i+1}. {a}" for i, a in enumerate(answers)])
+    metrics_text = "\n".join([f"{i+1}. {metric}" for i, metric in enumerate(EVALUATION_METRICS)])
+    raw_section = f"RAW AI EVALUATION:\n{raw_evaluation}\n\n" if raw_evaluation is not None else ""
+    
+    return f"""You are a senior VC analyst with 15+ years of experience evaluating startups. Evaluate the startup below for an investment committee.
+
+STARTUP INFORMATION:
+- Name: {startup['name']}
+- Industry: {startup['industry']}
+- Pitch: {startup['pitch']}
+- Founded: {startup['founded_year']}
+- Funding: {startup['funding']}
+
+QUESTIONS ASKED:
+{questions_text}
+
+FOUNDER'S ANSWERS:
+{answers_text}
+
+{raw_section}METRICS (evaluate every one, in this order):
+{metrics_text}
+
+Respond with only a JSON object of this shape:
+{{
+  "metrics": [
+    {{
+      "number": <metric number 1-15>,
+      "name": "<metric name exactly as listed>",
+      "score": <integer 1-10>,
+      "analysis": "<1-2 sentences using data from the answers>",
+      "strength": "<specific strength>",
+      "weakness": "<specific weakness>",
+      "improvement": "<actionable tip>"
+    }}
+  ],
+  "overall_assessment": "<6-8 sentence paragraph ending with an investment recommendation>"
+}}"""
+
 def build_groq_question_enhancement_prompt(startup, raw_questions):
     """Build prompt for Groq to enhance/validate questions"""
     return f"""You are a senior VC partner. Review and enhance these AI-generated questions for evaluating a startup.
@@ -108,6 +203,31 @@ REQUIREMENTS:
 
 Provide only the 10 refined questions, numbered 1-10."""
 
+def build_groq_direct_question_prompt(startup):
+    """Build prompt for Groq to write the questions from the startup info alone"""
+    return f"""You are a senior VC partner preparing to evaluate a startup.
+
+STARTUP INFORMATION:
+- Name: {startup['name']}
+- Industry: {startup['industry']}
+- Pitch: {startup['pitch']}
+- Founded: {startup['founded_year']}
+- Funding: {startup['funding']}
+
+TASK: Write exactly 10 high-quality questions that follow this structure:
+- 7 VC-style questions (focusing on business model, traction, financials, market, scalability, team, competition)
+- 2 industry-specific questions (tailored to {startup['industry']})
+- 1 founder capability question
+
+REQUIREMENTS:
+- Questions should be sharp, specific, and reveal key insights
+- Avoid generic questions - make them relevant to this specific startup
+- Ensure questions help assess investment potential
+- Number each question 1-10
+- Focus on metrics, data, and concrete evidence
+
+Provide only the 10 questions, numbered 1-10."""
+
 def parse_questions_from_response(response):
     """Parse questions from model response"""
     lines = response.strip().split("\n")
@@ -168,20 +288,19 @@ def format_evaluation_response(evaluation_text):
     if not evaluation_text:
         return "No evaluation generated."
     
-    # Add some basic formatting
-    lines = evaluation_text.split('\n')
-    formatted_lines = []
-    
-    for line in lines:
-        line = line.strip()
-        if line:
-            # Add spacing for numbered points
-            if line[0].isdigit() and '. ' in line:
-                formatted_lines.append('\n' + line)
-            # Add spacing for Overall Assessment
-            elif line.lower().startswith('overall'):
-                formatted_lines.append('\n' + line)
-            else:
-                formatted_lines.append(line)
-    
-    return '\n'.join(formatted_lines).strip()
\ No newline at end of file
+    # Spacing before numbered points and the overall assessment is added while parsing
+    return parse_evaluation(evaluation_text).formatted
+
+def render_structured_evaluation(structured):
+    """Render a structured (JSON-mode) evaluation dict in the free-text report format"""
+    lines = ["STARTUP EVALUATION REPORT", ""]
+    for metric in structured["metrics"]:
+        lines.append(
+            f"{metric['number']}. {metric['name']}: {metric['score']:g}/10 — {metric['analysis'].rstrip('.')}. "
+            f"Strength: {metric['strength'].rstrip('.')}. Weakness: {metric['weakness'].rstrip('.')}. "
+            f"Improvement: {metric['improvement'].rstrip('.')}."
+        )
+        lines.append("")
+    lines.append("Overall Assessment")
+    lines.append(structured["overall_assessment"])
+    return "\n".join(lines)
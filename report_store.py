@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+REPORTS_DB_PATH = os.getenv("REPORTS_DB_PATH", "data/reports.db")
+# Append-only file used before the store existed; imported once, then renamed
+LEGACY_REPORTS_PATH = os.getenv("LEGACY_REPORTS_PATH", "data/reports.jsonl")
+
+IDEA_PREFIX_CHARS = 80
+SORT_COLUMNS = {"timestamp": "ts", "score": "score"}
+
+
+class ReportStore:
+    """SQLite-backed store of saved evaluation reports
+
+    Reports are appended in WAL mode, so concurrent Streamlit sessions (and
+    processes) can write while others read. Listing reads only the indexed
+    summary columns of one page; the full record is loaded by id.
+    """
+
+    def __init__(self, path: str = REPORTS_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "id TEXT PRIMARY KEY, ts REAL NOT NULL, score REAL, idea_prefix TEXT NOT NULL, "
+                "market TEXT, record TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_reports_ts ON reports(ts)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_reports_score ON reports(score, ts)")
+            self._db.commit()
+
+    @staticmethod
+    def _score(record: dict) -> Optional[float]:
+        try:
+            return float((record.get("result") or {}).get("overall_score"))
+        except (TypeError, ValueError):
+            return None  # Missing or non-numeric, e.g. "N/A"
+
+    @staticmethod
+    def _row(record: dict) -> tuple:
+        return (
+            record["id"],
+            float(record["ts"]),
+            ReportStore._score(record),
+            (record.get("idea") or "")[:IDEA_PREFIX_CHARS],
+            record.get("market") or None,
+            json.dumps(record, ensure_ascii=False),
+        )
+
+    def append(self, record: dict):
+        """Save a report record (needs ``id`` and ``ts``)"""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO reports (id, ts, score, idea_prefix, market, record) VALUES (?, ?, ?, ?, ?, ?)",
+                self._row(record),
+            )
+            self._db.commit()
+
+    def get(self, report_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT record FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return json.loads(row["record"]) if row else None
+
+    @staticmethod
+    def _filters(min_score: Optional[float], max_score: Optional[float],
+                 since: Optional[float], until: Optional[float]):
+        clauses, params = [], []
+        for clause, value in (("score >= ?", min_score), ("score <= ?", max_score),
+                              ("ts >= ?", since), ("ts < ?", until)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def list(self, limit: int = 50, offset: int = 0, min_score: Optional[float] = None,
+             max_score: Optional[float] = None, since: Optional[float] = None, until: Optional[float] = None,
+             sort: str = "timestamp", descending: bool = True) -> List[dict]:
+        """Summaries (id, ts, score, idea_prefix, market) of one page of reports"""
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort: {sort}")
+        where, params = self._filters(min_score, max_score, since, until)
+        direction = "DESC" if descending else "ASC"
+        query = (
+            f"SELECT id, ts, score, idea_prefix, market FROM reports{where} "
+            f"ORDER BY {SORT_COLUMNS[sort]} {direction}, ts {direction} LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, (*params, limit, offset)).fetchall()]
+
+    def count(self, min_score: Optional[float] = None, max_score: Optional[float] = None,
+              since: Optional[float] = None, until: Optional[float] = None) -> int:
+        where, params = self._filters(min_score, max_score, since, until)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM reports{where}", params).fetchone()[0]
+
+    def import_jsonl(self, path: str) -> int:
+        """Import records from a reports.jsonl file, skipping ids already stored"""
+        rows = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    rows.append(self._row(json.loads(line)))
+                except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                    continue  # Partially written or malformed line
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO reports (id, ts, score, idea_prefix, market, record) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+            return self._db.total_changes - before
+
+
+# Singleton instance
+_report_store = None
+_report_store_lock = threading.Lock()
+
+def get_report_store() -> ReportStore:
+    """Get singleton report store, importing the legacy JSONL file on first use"""
+    global _report_store
+    with _report_store_lock:
+        if _report_store is None:
+            _report_store = ReportStore()
+            if LEGACY_REPORTS_PATH and os.path.exists(LEGACY_REPORTS_PATH):
+                imported = _report_store.import_jsonl(LEGACY_REPORTS_PATH)
+                os.replace(LEGACY_REPORTS_PATH, LEGACY_REPORTS_PATH + ".migrated")
+                logger.info(f"Imported {imported} report(s) from {LEGACY_REPORTS_PATH}")
+    return _report_store
@@ -0,0 +1,73 @@
+import logging
+import os
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Send requests straight to Groq when the local model is saturated
+GROQ_FAST_PATH = os.getenv("GROQ_FAST_PATH", "1") == "1"
+FAST_PATH_QUEUE_DEPTH = int(os.getenv("FAST_PATH_QUEUE_DEPTH", "4"))  # waiting local generations
+FAST_PATH_MAX_WAIT = float(os.getenv("FAST_PATH_MAX_WAIT", "60"))  # expected seconds before a local slot frees up
+LATENCY_WINDOW = 20
+
+
+class AdaptiveRouter:
+    """Chooses between the local model and a Groq-only fast path per request
+
+    The expected wait for a local slot is the number of generations ahead
+    of a new request times the recent mean local latency, divided by the
+    number of model workers. Requests are routed to Groq when the backlog or
+    that expected wait is over its threshold and Groq is healthy.
+    """
+
+    def __init__(self, backlog: Callable[[], int], workers: int, groq_ready: Callable[[], bool],
+                 enabled: bool = GROQ_FAST_PATH, max_backlog: int = FAST_PATH_QUEUE_DEPTH,
+                 max_wait: float = FAST_PATH_MAX_WAIT):
+        self.enabled = enabled
+        self.max_backlog = max_backlog
+        self.max_wait = max_wait
+        self.workers = max(1, workers)
+        self._backlog = backlog
+        self._groq_ready = groq_ready
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._routed: Dict[str, Dict[str, int]] = {}
+
+    def record_local(self, kind: str, seconds: float):
+        """Record how long a local generation of ``kind`` took"""
+        self._latencies.setdefault(kind, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def mean_latency(self, kind: str) -> Optional[float]:
+        latencies = self._latencies.get(kind)
+        return sum(latencies) / len(latencies) if latencies else None
+
+    def expected_wait(self, kind: str) -> Optional[float]:
+        latency = self.mean_latency(kind)
+        if latency is None:
+            return None
+        return self._backlog() * latency / self.workers
+
+    def use_groq_only(self, kind: str) -> bool:
+        """Decide whether a ``kind`` request should skip the local model"""
+        route = "local"
+        if self.enabled and self._groq_ready():
+            backlog = self._backlog()
+            expected_wait = self.expected_wait(kind)
+            if backlog >= self.max_backlog or (expected_wait is not None and expected_wait > self.max_wait):
+                route = "groq_only"
+                logger.info(f"Routing {kind} to Groq only (backlog {backlog}, expected wait {expected_wait or 0:.1f}s)")
+
+        counts = self._routed.setdefault(kind, {"local": 0, "groq_only": 0})
+        counts[route] += 1
+        return route == "groq_only"
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_backlog": self.max_backlog,
+            "max_wait_seconds": self.max_wait,
+            "backlog": self._backlog(),
+            "mean_local_latency": {kind: round(self.mean_latency(kind), 2) for kind in self._latencies},
+            "routed": self._routed,
+        }
+
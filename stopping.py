@@ -0,0 +1,113 @@
+import re
+import threading
+from typing import Callable, List, Optional
+
+from transformers import StoppingCriteria
+
+# Takes the generated text so far; returns the position to cut it at once it is complete
+StopRule = Callable[[str], Optional[int]]
+
+_NUMBERED_LINE = re.compile(r"^\s*(?:\*\*)?(?:Q(?:uestion)?\s*)?\d+\s*[.):]", re.IGNORECASE)
+_OVERALL_ASSESSMENT = re.compile(r"^[\W_]*overall assessment\b", re.IGNORECASE | re.MULTILINE)
+_NUMBERED_LINE_START = re.compile(r"^\s*(?:\*\*)?\d+\s*[.):]", re.MULTILINE)
+_NON_SPACE = re.compile(r"\S")
+_BLANK_LINE = re.compile(r"\n[ \t]*\n")
+
+
+def after_numbered_items(count: int = 10) -> StopRule:
+    """Complete once the ``count``-th numbered line has ended"""
+    def rule(text: str) -> Optional[int]:
+        seen = 0
+        position = 0
+        for line in text.splitlines(keepends=True):
+            position += len(line)
+            if _NUMBERED_LINE.match(line):
+                seen += 1
+                if seen == count and (line.endswith("\n") or line.rstrip().endswith("?")):
+                    return position
+        return None
+    return rule
+
+
+def after_overall_assessment() -> StopRule:
+    """Complete once the paragraph after an "Overall Assessment" heading ends with a blank line
+
+    The heading must start a line and follow the numbered criteria, so the
+    phrase inside a criterion or before the list does not end generation.
+    """
+    def rule(text: str) -> Optional[int]:
+        first_item = _NUMBERED_LINE_START.search(text)
+        if first_item is None:
+            return None
+        match = _OVERALL_ASSESSMENT.search(text, first_item.end())
+        if match is None:
+            return None
+        # The paragraph starts at the first text after the heading and its punctuation,
+        # either on the heading line itself or on the next non-empty line
+        paragraph = _NON_SPACE.search(text, match.end())
+        while paragraph is not None and text[paragraph.start()] in ":*#-—":
+            paragraph = _NON_SPACE.search(text, paragraph.end())
+        if paragraph is None:
+            return None
+        end = _BLANK_LINE.search(text, paragraph.start())
+        return end.start() if end is not None else None
+    return rule
+
+
+def on_stop_strings(stop_strings: List[str]) -> StopRule:
+    """Complete as soon as any of ``stop_strings`` appears (the stop string is cut off)"""
+    def rule(text: str) -> Optional[int]:
+        positions = [text.find(stop) for stop in stop_strings]
+        positions = [position for position in positions if position != -1]
+        return min(positions) if positions else None
+    return rule
+
+
+def find_stop(text: str, rules: List[StopRule]) -> Optional[int]:
+    """Earliest cut position of any rule, or None if no rule is complete yet"""
+    positions = [position for position in (rule(text) for rule in rules) if position is not None]
+    return min(positions) if positions else None
+
+
+def truncate_at_stop(text: str, rules: List[StopRule]) -> str:
+    """Drop text generated after the first complete stop rule"""
+    position = find_stop(text, rules)
+    return text if position is None else text[:position]
+
+
+class TextStoppingCriteria(StoppingCriteria):
+    """Stops ``generate`` once every sequence has hit EOS or completed a stop rule
+
+    Text is decoded every ``check_every`` steps; tokens generated past the stop
+    point are removed afterwards with ``truncate_at_stop``.
+    """
+
+    def __init__(self, tokenizer, prompt_length: int, rules: List[StopRule], check_every: int = 4):
+        self.tokenizer = tokenizer
+        self.prompt_length = prompt_length
+        self.rules = rules
+        self.check_every = check_every
+        self._steps = 0
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        self._steps += 1
+        if self._steps % self.check_every:
+            return False
+
+        generated = input_ids[:, self.prompt_length:]
+        texts = self.tokenizer.batch_decode(generated, skip_special_tokens=True)
+        eos_token_id = self.tokenizer.eos_token_id
+        return all(
+            (eos_token_id is not None and bool((row == eos_token_id).any())) or find_stop(text, self.rules) is not None
+            for row, text in zip(generated, texts)
+        )
+
+
+class CancelStoppingCriteria(StoppingCriteria):
+    """Stops ``generate`` at the next step once ``cancel`` is set, e.g. when the client went away"""
+
+    def __init__(self, cancel: threading.Event):
+        self.cancel = cancel
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.cancel.is_set()
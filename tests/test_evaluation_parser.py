@@ -0,0 +1,92 @@
+import pytest
+
+from evaluation_parser import EvaluationParser, parse_evaluation
+from prompt import format_evaluation_response
+
+REPORT = (
+    "STARTUP EVALUATION REPORT\n\n"
+    "1. **Market Size & Opportunity**: 7/10 — Large and growing market. "
+    "**Strengths:** Big TAM. **Weaknesses**: Crowded. __Improvements:__ Niche down.\n\n"
+    "2. Team Strength & Experience: Score: 8 — Strong founders.\n"
+    "Strength: Domain experts. Weakness: No CTO. Improvement: Hire one.\n"
+    "  3) Product-Market Fit: 6.5/10 — Early signs. Strengths: Retention. "
+    "Weaknesses: Small sample. Improvements: Run pilots.\n\n"
+    "Overall Assessment\n"
+    "Promising company. Next steps:\n"
+    "1. Close the seed round.\n"
+    "2. Hire a CTO.\n"
+)
+
+
+def legacy_format(evaluation_text):
+    """The layout format_evaluation_response produced before the parser existed"""
+    formatted_lines = []
+    for line in evaluation_text.split("\n"):
+        line = line.strip()
+        if line:
+            if line[0].isdigit() and ". " in line:
+                formatted_lines.append("\n" + line)
+            elif line.lower().startswith("overall"):
+                formatted_lines.append("\n" + line)
+            else:
+                formatted_lines.append(line)
+    return "\n".join(formatted_lines).strip()
+
+
+def feed_in_chunks(text, size):
+    parser = EvaluationParser()
+    streamed = []
+    for start in range(0, len(text), size):
+        streamed.extend(parser.feed(text[start:start + size]))
+    streamed.extend(parser.close())
+    return parser.result(), streamed
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 64, len(REPORT)])
+def test_chunked_parsing_matches_whole_text(size):
+    whole = parse_evaluation(REPORT)
+    result, streamed = feed_in_chunks(REPORT, size)
+    assert result == whole
+    # Every criterion is reported by feed/close exactly once, in order
+    assert streamed == whole.criteria
+
+
+@pytest.mark.parametrize("text", [REPORT, REPORT.rstrip("\n"), "  1. A: 5/10 — x\n\n\nOverall: fine  ", "no numbered lines"])
+def test_formatted_matches_legacy_layout(text):
+    assert parse_evaluation(text).formatted == legacy_format(text)
+    assert format_evaluation_response(text) == legacy_format(text)
+
+
+def test_criteria_fields():
+    criteria = parse_evaluation(REPORT).criteria
+    assert [(c.number, c.criterion, c.score) for c in criteria] == [
+        (1, "Market Size & Opportunity", 7.0),
+        (2, "Team Strength & Experience", 8.0),
+        (3, "Product-Market Fit", 6.5),
+    ]
+    assert criteria[1].analysis == "Strong founders"
+
+
+@pytest.mark.parametrize("index", [0, 1, 2])
+def test_bold_and_plural_labels(index):
+    criterion = parse_evaluation(REPORT).criteria[index]
+    expected = [
+        ("Large and growing market", "Big TAM", "Crowded", "Niche down"),
+        ("Strong founders", "Domain experts", "No CTO", "Hire one"),
+        ("Early signs", "Retention", "Small sample", "Run pilots"),
+    ][index]
+    assert (criterion.analysis, criterion.strength, criterion.weakness, criterion.improvement) == expected
+
+
+def test_numbered_lines_in_overall_assessment_are_not_criteria():
+    parsed = parse_evaluation(REPORT)
+    assert len(parsed.criteria) == 3
+    assert parsed.overall_assessment == (
+        "Overall Assessment Promising company. Next steps: 1. Close the seed round. 2. Hire a CTO."
+    )
+
+
+def test_missing_labels_leave_fields_empty():
+    criterion = parse_evaluation("1. Risk Assessment: 4/10 — Many open risks.").criteria[0]
+    assert criterion.analysis == "Many open risks"
+    assert criterion.strength is None and criterion.weakness is None and criterion.improvement is None
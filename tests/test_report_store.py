@@ -0,0 +1,78 @@
+import json
+
+from report_store import ReportStore
+
+
+def record(report_id, ts, score, idea="An idea"):
+    return {"id": report_id, "ts": ts, "idea": idea, "market": "SaaS", "result": {"overall_score": score}}
+
+
+def make_store():
+    store = ReportStore(":memory:")
+    store.append(record("a", 100, 40))
+    store.append(record("b", 200, 90))
+    store.append(record("c", 300, 65))
+    return store
+
+
+def test_append_and_get_round_trip():
+    store = ReportStore(":memory:")
+    report = record("a", 100, 72.5, idea="x" * 200)
+    store.append(report)
+    assert store.get("a") == report
+    assert store.get("missing") is None
+
+
+def test_list_returns_summaries_only():
+    row = make_store().list(limit=1)[0]
+    assert set(row) == {"id", "ts", "score", "idea_prefix", "market"}
+
+
+def test_list_sorts_by_timestamp_both_ways():
+    store = make_store()
+    assert [row["id"] for row in store.list()] == ["c", "b", "a"]
+    assert [row["id"] for row in store.list(descending=False)] == ["a", "b", "c"]
+
+
+def test_list_sorts_by_score_both_ways():
+    store = make_store()
+    assert [row["id"] for row in store.list(sort="score")] == ["b", "c", "a"]
+    assert [row["id"] for row in store.list(sort="score", descending=False)] == ["a", "c", "b"]
+
+
+def test_list_pages_with_limit_and_offset():
+    assert [row["id"] for row in make_store().list(limit=1, offset=1)] == ["b"]
+
+
+def test_list_and_count_filter_by_score_and_time():
+    store = make_store()
+    assert [row["id"] for row in store.list(min_score=50, max_score=70)] == ["c"]
+    assert [row["id"] for row in store.list(since=150, until=300)] == ["b"]
+    assert store.count(min_score=50) == 2
+    assert store.count(since=150, until=300) == 1
+    assert store.count() == 3
+
+
+def test_non_numeric_score_is_stored_as_missing():
+    store = ReportStore(":memory:")
+    store.append(record("a", 100, "N/A"))
+    assert store.list()[0]["score"] is None
+    assert store.count(min_score=0) == 0
+
+
+def test_import_jsonl_skips_malformed_lines_and_duplicates(tmp_path):
+    store = ReportStore(":memory:")
+    store.append(record("a", 100, 40))
+    path = tmp_path / "reports.jsonl"
+    path.write_text(
+        json.dumps(record("a", 100, 40)) + "\n"
+        + json.dumps(record("b", 200, 90)) + "\n"
+        + "\n"
+        + '{"id": "c", "ts": 3\n'
+        + json.dumps({"ts": 400}) + "\n"
+        + json.dumps(record("b", 200, 90)) + "\n",
+        encoding="utf-8",
+    )
+    assert store.import_jsonl(str(path)) == 1
+    assert store.count() == 2
+    assert store.get("b") == record("b", 200, 90)
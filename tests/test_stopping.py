@@ -0,0 +1,81 @@
+import threading
+
+from stopping import (
+    CancelStoppingCriteria,
+    after_numbered_items,
+    after_overall_assessment,
+    find_stop,
+    on_stop_strings,
+    truncate_at_stop,
+)
+
+REPORT = (
+    "STARTUP EVALUATION REPORT\n\n"
+    "1. Market Size & Opportunity: 7/10 — Large market.\n\n"
+    "2. Team Strength & Experience: 8/10 — Strong founders.\n\n"
+    "Overall Assessment\n"
+    "Promising company. Invest.\n\n"
+)
+
+
+def test_overall_assessment_stops_after_paragraph():
+    text = REPORT + "Extra text the model kept generating."
+    assert truncate_at_stop(text, [after_overall_assessment()]) == REPORT.rstrip("\n")
+
+
+def test_overall_assessment_incomplete_paragraph_does_not_stop():
+    assert after_overall_assessment()(REPORT.rstrip("\n")) is None
+
+
+def test_overall_assessment_phrase_inside_sentence_is_not_a_heading():
+    text = (
+        "The team is strong, which lifts the overall assessment of execution risk.\n\n"
+        "1. Market: 7/10 — Large market.\n\n"
+        "Overall Assessment\nInvest.\n\n"
+    )
+    assert truncate_at_stop(text, [after_overall_assessment()]) == text.rstrip("\n")
+
+
+def test_overall_assessment_phrase_inside_criterion_is_not_a_heading():
+    text = "1. Risk Assessment: 6/10 — Improves the overall assessment of the team.\n\n2. Team: 8/10 — Good.\n\n"
+    assert after_overall_assessment()(text) is None
+
+
+def test_overall_assessment_before_numbered_criteria_is_ignored():
+    text = "Overall Assessment\nSummary first.\n\n1. Market: 7/10 — Large market.\n\n"
+    assert after_overall_assessment()(text) is None
+
+
+def test_overall_assessment_markdown_heading_with_inline_paragraph():
+    text = "1. Market: 7/10 — Large.\n\n**Overall Assessment:** Invest now.\n\nTrailing"
+    assert truncate_at_stop(text, [after_overall_assessment()]).endswith("Invest now.")
+
+
+def test_numbered_items_stops_after_last_question():
+    questions = "\n".join(f"{n}. Question number {n}?" for n in range(1, 11))
+    text = questions + "\n11. Extra question?"
+    assert truncate_at_stop(text, [after_numbered_items(10)]) == questions + "\n"
+
+
+def test_numbered_items_waits_for_last_line_to_end():
+    text = "\n".join(f"{n}. Question number {n}" for n in range(1, 11))
+    assert after_numbered_items(10)(text) is None
+    assert after_numbered_items(10)(text + "\n") == len(text) + 1
+
+
+def test_stop_strings_cut_before_stop():
+    assert truncate_at_stop("answer</s>junk", [on_stop_strings(["</s>"])]) == "answer"
+
+
+def test_find_stop_returns_earliest_rule():
+    rules = [on_stop_strings(["END"]), on_stop_strings(["STOP"])]
+    assert find_stop("a STOP b END", rules) == 2
+    assert find_stop("nothing here", rules) is None
+
+
+def test_cancel_criteria_stops_once_event_is_set():
+    cancel = threading.Event()
+    criteria = CancelStoppingCriteria(cancel)
+    assert not criteria(None, None)
+    cancel.set()
+    assert criteria(None, None)
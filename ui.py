@@ -78,6 +78,27 @@ def init_session_state():
         if key not in st.session_state:
             st.session_state[key] = default_value
 
+def stream_events(path, payload, timeout):
+    """POST to a streaming endpoint and yield (event, data) pairs from its SSE stream"""
+    with requests.post(f"{API_BASE_URL}{path}", json=payload, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("detail", "Unknown error")
+            except ValueError:
+                detail = response.text
+            yield "error", {"status_code": response.status_code, "detail": detail}
+            return
+        
+        event = "message"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:"):].strip())
+                event = "message"
+
 def check_system_health():
     """Check system health and display status"""
     try:
@@ -169,17 +190,29 @@ def generate_questions_flow(name, industry, pitch, founded_year, funding):
         "funding": funding
     }
     
-    with st.spinner("🤖 AI is generating tailored questions... This may take 30-60 seconds"):
+    status_text = st.empty()
+    live_output = st.empty()
+    streamed = {}
+    
+    with st.spinner("🤖 AI is generating tailored questions..."):
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/generate-questions",
-                json=startup_data,
-                timeout=90
-            )
+            result = None
+            # Timeout applies between streamed chunks, not to the whole request
+            for event, payload in stream_events("/generate-questions/stream", startup_data, timeout=90):
+                if event == "stage":
+                    status_text.text(payload["message"])
+                elif event == "token":
+                    streamed[payload["stage"]] = streamed.get(payload["stage"], "") + payload["text"]
+                    live_output.text(streamed[payload["stage"]])
+                elif event == "done":
+                    result = payload
+                elif event == "error":
+                    st.error(f"❌ Error generating questions: {payload['detail']}")
             
-            if response.status_code == 200:
-                result = response.json()
-                
+            status_text.empty()
+            live_output.empty()
+            
+            if result:
                 # Store in session state
                 st.session_state.startup_info = startup_data
                 st.session_state.questions = result["questions"]
@@ -197,10 +230,6 @@ def generate_questions_flow(name, industry, pitch, founded_year, funding):
                 
                 st.rerun()
                 
-            else:
-                error_detail = response.json().get("detail", "Unknown error")
-                st.error(f"❌ Error generating questions: {error_detail}")
-                
         except requests.exceptions.Timeout:
             st.error("⏱️ Request timed out. The models might be loading. Please try again.")
         except Exception as e:
@@ -300,25 +329,30 @@ def evaluate_startup_flow(answers, enhance_evaluation):
     
     progress_bar = st.progress(0)
     status_text = st.empty()
+    live_output = st.empty()
+    streamed = {}
     
     with st.spinner("🔍 AI is analyzing your startup..."):
         try:
-            # Update progress
-            progress_bar.progress(25)
-            status_text.text("📊 Fine-tuned model generating evaluation...")
+            result = None
+            error_detail = None
+            # Timeout applies between streamed chunks, not to the whole request
+            for event, payload in stream_events("/evaluate-startup/stream", evaluation_data, timeout=180):
+                if "progress" in payload:
+                    progress_bar.progress(int(payload["progress"] * 100))
+                if event == "stage":
+                    status_text.text(payload["message"])
+                elif event == "token":
+                    streamed[payload["stage"]] = streamed.get(payload["stage"], "") + payload["text"]
+                    live_output.text(streamed[payload["stage"]])
+                elif event == "done":
+                    result = payload
+                elif event == "error":
+                    error_detail = payload["detail"]
             
-            response = requests.post(
-                f"{API_BASE_URL}/evaluate-startup",
-                json=evaluation_data,
-                timeout=180  # 3 minutes timeout
-            )
+            live_output.empty()
             
-            progress_bar.progress(75)
-            status_text.text("🚀 Groq enhancing evaluation..." if enhance_evaluation else "📝 Finalizing evaluation...")
-            
-            if response.status_code == 200:
-                result = response.json()
-                
+            if result:
                 progress_bar.progress(100)
                 status_text.text("✅ Evaluation completed!")
                 
@@ -342,8 +376,7 @@ def evaluate_startup_flow(answers, enhance_evaluation):
             else:
                 progress_bar.empty()
                 status_text.empty()
-                error_detail = response.json().get("detail", "Unknown error")
-                st.error(f"❌ Evaluation failed: {error_detail}")
+                st.error(f"❌ Evaluation failed: {error_detail or 'Unknown error'}")
                 
         except requests.exceptions.Timeout:
             progress_bar.empty()
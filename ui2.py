@@ -3,9 +3,9 @@ import requests
 import json
 import time
 import pandas as pd
-import re
 from datetime import datetime
 from io import BytesIO
+from evaluation_parser import parse_evaluation
 try:
     from reportlab.lib.pagesizes import letter, A4
     from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
@@ -436,6 +436,7 @@ def init_session_state():
         "raw_questions": [],
         "answers": [],
         "evaluation_result": None,
+        "evaluation_job_id": None,
         "system_health": None
     }
     
@@ -443,6 +444,35 @@ def init_session_state():
         if key not in st.session_state:
             st.session_state[key] = default_value
 
+def stream_events(path, payload, timeout):
+    """Open a streaming endpoint and yield (event, data) pairs from its SSE stream
+
+    POSTs ``payload`` as JSON, or GETs ``path`` when ``payload`` is None.
+    """
+    if payload is None:
+        request = requests.get(f"{API_BASE_URL}{path}", stream=True, timeout=timeout)
+    else:
+        request = requests.post(f"{API_BASE_URL}{path}", json=payload, stream=True, timeout=timeout)
+    
+    with request as response:
+        if response.status_code != 200:
+            try:
+                detail = response.json().get("detail", "Unknown error")
+            except ValueError:
+                detail = response.text
+            yield "error", {"status_code": response.status_code, "detail": detail}
+            return
+        
+        event = "message"
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                yield event, json.loads(line[len("data:"):].strip())
+                event = "message"
+
 def check_system_health():
     """Check system health and display status"""
     try:
@@ -534,17 +564,29 @@ def generate_questions_flow(name, industry, pitch, founded_year, funding):
         "funding": funding
     }
     
-    with st.spinner("🤖 AI is generating tailored questions... This may take 30-60 seconds"):
+    status_text = st.empty()
+    live_output = st.empty()
+    streamed = {}
+    
+    with st.spinner("🤖 AI is generating tailored questions..."):
         try:
-            response = requests.post(
-                f"{API_BASE_URL}/generate-questions",
-                json=startup_data,
-                timeout=90
-            )
+            result = None
+            # Timeout applies between streamed chunks, not to the whole request
+            for event, payload in stream_events("/generate-questions/stream", startup_data, timeout=90):
+                if event == "stage":
+                    status_text.text(payload["message"])
+                elif event == "token":
+                    streamed[payload["stage"]] = streamed.get(payload["stage"], "") + payload["text"]
+                    live_output.text(streamed[payload["stage"]])
+                elif event == "done":
+                    result = payload
+                elif event == "error":
+                    st.error(f"❌ Question generation failed: {payload['detail']}")
             
-            if response.status_code == 200:
-                result = response.json()
-                
+            status_text.empty()
+            live_output.empty()
+            
+            if result:
                 # Store in session state
                 st.session_state.startup_info = startup_data
                 st.session_state.questions = result["questions"]
@@ -562,10 +604,6 @@ def generate_questions_flow(name, industry, pitch, founded_year, funding):
                 
                 st.rerun()
                 
-            else:
-                error_detail = response.json().get("detail", "Unknown error")
-                st.error(f"❌ Question generation failed: {error_detail}")
-                
         except requests.exceptions.Timeout:
             st.error("⏱️ Request timed out. The AI might be processing a complex request.")
         except Exception as e:
@@ -627,6 +665,8 @@ def step2_answer_questions(enhance_evaluation):
             st.error(f"⚠️ Please answer all questions. Missing answers for questions: {', '.join(map(str, empty_answers))}")
         else:
             generate_evaluation(answers, enhance_evaluation)
+    elif st.session_state.evaluation_job_id and not st.session_state.evaluation_result:
+        follow_evaluation_job(st.session_state.evaluation_job_id)
 
 def generate_evaluation(answers, enhance_evaluation):
     """Generate startup evaluation"""
@@ -634,36 +674,60 @@ def generate_evaluation(answers, enhance_evaluation):
         "startup": st.session_state.startup_info,
         "questions": st.session_state.questions,
         "answers": answers,
-        "enhance_with_groq": enhance_evaluation
+        "enhance_with_groq": enhance_evaluation,
+        "structured_output": enhance_evaluation
     }
     
+    try:
+        # Queue the evaluation as a job, then follow its stage progress
+        response = requests.post(f"{API_BASE_URL}/jobs/evaluate", json=evaluation_data, timeout=30)
+        if response.status_code != 202:
+            raise RuntimeError(response.json().get("detail", "Unknown error"))
+    except Exception as e:
+        st.error(f"❌ Evaluation failed: {str(e)}")
+        return
+    
+    # Remembered so a rerun while the job runs reattaches instead of losing it
+    st.session_state.evaluation_job_id = response.json()["job_id"]
+    st.session_state.answers = answers
+    follow_evaluation_job(st.session_state.evaluation_job_id)
+
+def follow_evaluation_job(job_id):
+    """Show a queued evaluation job's progress until it finishes"""
     progress_bar = st.progress(0)
     status_text = st.empty()
+    live_output = st.empty()
+    streamed = {}
     
     with st.spinner("🔍 AI is analyzing your startup..."):
         try:
-            # Update progress
-            progress_bar.progress(25)
-            status_text.text("📊 Fine-tuned model generating evaluation...")
+            result = None
+            error_detail = None
+            status_text.text("⏳ Evaluation queued...")
             
-            response = requests.post(
-                f"{API_BASE_URL}/evaluate-startup",
-                json=evaluation_data,
-                timeout=180  # 3 minutes timeout
-            )
+            # Timeout applies between streamed chunks, not to the whole request
+            for event, payload in stream_events(f"/jobs/{job_id}/events", None, timeout=180):
+                if "progress" in payload and payload["progress"] is not None:
+                    progress_bar.progress(int(payload["progress"] * 100))
+                if event == "stage":
+                    status_text.text(payload["message"])
+                elif event == "token":
+                    streamed[payload["stage"]] = streamed.get(payload["stage"], "") + payload["text"]
+                    live_output.text(streamed[payload["stage"]])
+                elif event == "done":
+                    result = payload
+                elif event == "error":
+                    error_detail = payload["detail"]
             
-            progress_bar.progress(75)
-            status_text.text("🚀 Groq enhancing evaluation..." if enhance_evaluation else "📝 Finalizing evaluation...")
+            live_output.empty()
             
-            if response.status_code == 200:
-                result = response.json()
-                
+            if result:
                 progress_bar.progress(100)
                 status_text.text("✅ Evaluation completed!")
                 
                 # Store results
                 st.session_state.evaluation_result = result
-                st.session_state.answers = answers
+                st.session_state.evaluation_job_id = None
                 
                 # Show success message
                 method = result["method_used"]
@@ -679,15 +743,16 @@ def generate_evaluation(answers, enhance_evaluation):
                 st.rerun()
                 
             else:
+                st.session_state.evaluation_job_id = None
                 progress_bar.empty()
                 status_text.empty()
-                error_detail = response.json().get("detail", "Unknown error")
-                st.error(f"❌ Evaluation failed: {error_detail}")
+                st.error(f"❌ Evaluation failed: {error_detail or 'Unknown error'}")
                 
         except requests.exceptions.Timeout:
+            # The job keeps running on the server; the next rerun reattaches to it
             progress_bar.empty()
             status_text.empty()
-            st.error("⏱️ Evaluation timed out. The process might take longer for complex evaluations.")
+            st.warning("⏱️ Still evaluating. The report will appear here when it is ready; refresh to check again.")
         except Exception as e:
             progress_bar.empty()
             status_text.empty()
@@ -722,85 +787,42 @@ def step3_display_results():
         display_qa_summary()
 
 # Add these helper functions before display_final_report
-def parse_evaluation_to_table(evaluation_text):
-    """Parse evaluation text into structured data and extract overall assessment"""
+@st.cache_data(show_spinner=False)
+def parse_evaluation_to_table(evaluation_text, criteria=None, overall_assessment=None, structured=None):
+    """Build the criteria table and overall assessment for an evaluation
+
+    Prefers the schema-validated ``structured`` output, then the ``criteria``
+    returned by the API, and only parses the text for results that lack both.
+    Cached, so reruns don't redo the work.
+    """
+    if structured:
+        criteria_data = [
+            {
+                'Criterion': metric['name'],
+                'Score': f"{metric['score']:g}",
+                'Evaluation': f"{metric['analysis']} Strength: {metric['strength']} "
+                              f"Weakness: {metric['weakness']} Improvement: {metric['improvement']}"
+            }
+            for metric in structured['metrics']
+        ]
+        return pd.DataFrame(criteria_data), structured['overall_assessment']
+    
     if not evaluation_text:
         return pd.DataFrame(), ""
     
-    # Split text into lines and find numbered criteria
-    lines = evaluation_text.split('\n')
-    criteria_data = []
-    overall_assessment = ""
-    
-    current_criterion = None
-    current_score = None
-    current_evaluation = []
-    collecting_overall = False
-    overall_lines = []
+    if not criteria:
+        parsed = parse_evaluation(evaluation_text)
+        criteria = [record.to_dict() for record in parsed.criteria]
+        overall_assessment = parsed.overall_assessment
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # Check for overall assessment section
-        if re.search(r'overall|summary|conclusion|assessment|recommendation', line.lower()) and not re.match(r'^\d+\.\s+', line):
-            collecting_overall = True
-            overall_lines.append(line)
-            continue
-        
-        if collecting_overall:
-            overall_lines.append(line)
-            continue
-            
-        # Look for numbered criteria (1. 2. 3. etc.)
-        if re.match(r'^\d+\.\s+', line):
-            # Save previous criterion if exists
-            if current_criterion:
-                criteria_data.append({
-                    'Criterion': current_criterion,
-                    'Score': current_score or 'N/A',
-                    'Evaluation': ' '.join(current_evaluation)
-                })
-            
-            # Extract criterion name and score
-            parts = line.split(':')
-            if len(parts) >= 2:
-                criterion_part = parts[0]
-                rest = ':'.join(parts[1:]).strip()
-                
-                # Extract criterion name (remove number)
-                current_criterion = re.sub(r'^\d+\.\s+', '', criterion_part).strip()
-                
-                # Look for score in the rest
-                score_match = re.search(r'(\d+(?:\.\d+)?)/10|Score:\s*(\d+(?:\.\d+)?)', rest)
-                if score_match:
-                    current_score = score_match.group(1) or score_match.group(2)
-                else:
-                    current_score = 'N/A'
-                
-                # Start collecting evaluation text
-                current_evaluation = [rest]
-            else:
-                current_criterion = re.sub(r'^\d+\.\s+', '', line).strip()
-                current_score = 'N/A'
-                current_evaluation = []
-        else:
-            # Continue collecting evaluation text
-            if current_criterion and line and not collecting_overall:
-                current_evaluation.append(line)
-    
-    # Add the last criterion
-    if current_criterion:
-        criteria_data.append({
-            'Criterion': current_criterion,
-            'Score': current_score or 'N/A',
-            'Evaluation': ' '.join(current_evaluation)
-        })
-    
-    # Process overall assessment
-    if overall_lines:
-        overall_assessment = ' '.join(overall_lines)
+    criteria_data = [
+        {
+            'Criterion': item['criterion'],
+            'Score': f"{item['score']:g}" if item.get('score') is not None else 'N/A',
+            'Evaluation': item['text']
+        }
+        for item in criteria
+    ]
     
     # If no structured data found, create a simple table
     if not criteria_data:
@@ -813,7 +835,7 @@ def parse_evaluation_to_table(evaluation_text):
                 'Evaluation': sentence
             })
     
-    return pd.DataFrame(criteria_data), overall_assessment
+    return pd.DataFrame(criteria_data), overall_assessment or ""
 
 def generate_pdf_report(df, startup_info, result):
     """Generate PDF report with proper formatting and colors"""
@@ -901,7 +923,9 @@ def display_final_report(result):
     evaluation_text = result.get("evaluation", "No evaluation available")
     
     # Parse evaluation into table format and extract overall assessment
-    df, overall_assessment = parse_evaluation_to_table(evaluation_text)
+    df, overall_assessment = parse_evaluation_to_table(
+        evaluation_text, result.get("criteria"), result.get("overall_assessment"), result.get("structured")
+    )
     
     if not df.empty:
         st.markdown("### 📊 Evaluation Results Table")
@@ -1260,7 +1284,7 @@ def display_qa_summary():
 def clear_all_data():
     """Clear all session data"""
     if st.button("⚠️ Confirm Clear All", type="primary"):
-        for key in ["startup_info", "questions", "raw_questions", "answers", "evaluation_result"]:
+        for key in ["startup_info", "questions", "raw_questions", "answers", "evaluation_result", "evaluation_job_id"]:
             if key in st.session_state:
                 if key in ["questions", "raw_questions", "answers"]:
                     st.session_state[key] = []